@@ -0,0 +1,102 @@
+import os
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+class AssetCache:
+    """
+    Fonts and scaled images, each kept per target size so the same asset is
+    never loaded or scaled twice in a process; only the max_images most
+    recently used images stay in memory. With a cache_dir, scaled images are
+    also written to disk as uncompressed BMPs (far cheaper to read back than
+    decoding and rescaling the original) named after the source file, its
+    size and mtime, and the target resolution, so relaunching on the same
+    display skips the work. Disk writes run on a background thread and only
+    the max_files most recently used files are kept.
+    """
+    def __init__(self, cache_dir=None, max_images=8, max_files=8):
+        self.cache_dir = cache_dir
+        self.max_images = max_images
+        self.max_files = max_files
+        self.fonts = {}
+        self.images = OrderedDict()
+        self._writer = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def font(self, name, size):
+        key = (name, size)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.Font(name, size)
+        return self.fonts[key]
+
+    def _disk_path(self, path, size):
+        stat = os.stat(path)
+        stamp = zlib.crc32(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{stamp:08x}-{size[0]}x{size[1]}.bmp")
+
+    def image(self, path, size=None, persist=True):
+        """
+        `path` loaded (and scaled to `size`); raises pygame.error/OSError if it
+        cannot be read. persist=False keeps it out of the disk cache, for sizes
+        that are only passed through (e.g. while the window is being resized).
+        """
+        key = (path, tuple(size) if size else None)
+        if key in self.images:
+            self.images.move_to_end(key)
+            return self.images[key]
+
+        disk_path = self._disk_path(path, size) if self.cache_dir and size else None
+        if disk_path and os.path.exists(disk_path):
+            image = pygame.image.load(disk_path)
+            _touch(disk_path) # Most recently used files survive eviction
+        else:
+            image = pygame.image.load(path)
+            if size and image.get_size() != tuple(size):
+                try:
+                    image = pygame.transform.smoothscale(image, size)
+                except ValueError: # smoothscale only handles 24/32-bit images
+                    image = pygame.transform.scale(image, size)
+            if disk_path and persist:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asset-cache")
+                self._writer.submit(self._save, image, disk_path)
+        if pygame.display.get_surface() is not None:
+            image = image.convert() # Matches the display format so every blit is a plain copy
+        self.images[key] = image
+        while len(self.images) > self.max_images:
+            self.images.popitem(last=False)
+        return image
+
+    def _save(self, image, disk_path):
+        """Writes `image` atomically (runs on the writer thread), then evicts the oldest files."""
+        temp_path = disk_path[:-len(".bmp")] + ".tmp.bmp"
+        try:
+            pygame.image.save(image, temp_path)
+            os.replace(temp_path, disk_path)
+        except (pygame.error, OSError):
+            return # The disk cache is best effort; the image is still cached in memory
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".bmp") and not name.endswith(".tmp.bmp"):
+                try:
+                    entries.append((os.path.getmtime(os.path.join(self.cache_dir, name)), name))
+                except OSError: # Removed by another process in the meantime
+                    pass
+        entries.sort()
+        for _, name in entries[:max(0, len(entries) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError: # Read-only cache directory
+        pass
@@ -7,4 +7,7 @@ class Colors:
     DARK_GRAY = (64, 64, 64)
     RED = (220, 20, 20)
     GREEN = (20, 200, 20)
-    BLUE = (20, 20, 200)
\ No newline at end of file
+    BLUE = (20, 20, 200)
+    ORANGE = (255, 165, 0)
+    CYAN = (0, 200, 220)
+    YELLOW = (240, 220, 40)
\ No newline at end of file
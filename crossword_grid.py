@@ -0,0 +1,207 @@
+from collections import defaultdict, namedtuple
+
+ACROSS, DOWN = 1, 2
+
+Placement = namedtuple('Placement', 'word row col direction')
+STEP_BUDGET = 3000 # Search nodes plus placement checks per grid, roughly 20 ms at worst
+
+
+class LetterIndex:
+    """
+    Precomputed letter -> [(position, tail, word)] index over a vocabulary,
+    where tail is the number of letters after the position. Together they
+    encode (length, position, letter), so crossings that would run past the
+    grid bounds are skipped with two integer comparisons, before any
+    placement is built or checked.
+    """
+    def __init__(self, words):
+        self.by_letter = defaultdict(list)
+        for word in sorted(set(words)):
+            for pos, letter in enumerate(word):
+                self.by_letter[letter].append((pos, len(word) - 1 - pos, word))
+
+    def crossings(self, letter, max_pos, max_tail):
+        """(word, position) pairs for `letter` with at most max_pos letters before it and max_tail after."""
+        return [(word, pos) for pos, tail, word in self.by_letter.get(letter, ())
+                if pos <= max_pos and tail <= max_tail]
+
+
+class CrosswordGrid:
+    """An interlocking arrangement of words, normalised so the top-left cell is (0, 0)."""
+    def __init__(self, placements):
+        min_row = min(p.row for p in placements)
+        min_col = min(p.col for p in placements)
+        self.placements = [Placement(p.word, p.row - min_row, p.col - min_col, p.direction) for p in placements]
+        self.cells = {}
+        for placement in self.placements:
+            for i, cell in enumerate(word_cells(placement)):
+                self.cells[cell] = placement.word[i]
+        self.rows = max(r for r, _ in self.cells) + 1
+        self.cols = max(c for _, c in self.cells) + 1
+        self.words = {p.word: p for p in self.placements}
+        self.numbers = self._number_placements()
+
+    def _number_placements(self):
+        """Clue numbers in reading order, shared by words starting on the same cell."""
+        starts = sorted({(p.row, p.col) for p in self.placements})
+        return {start: i + 1 for i, start in enumerate(starts)}
+
+    def cells_for(self, word):
+        placement = self.words.get(word)
+        return word_cells(placement) if placement else []
+
+
+def word_cells(placement):
+    dr, dc = (0, 1) if placement.direction == ACROSS else (1, 0)
+    return [(placement.row + dr * i, placement.col + dc * i) for i in range(len(placement.word))]
+
+
+class CrosswordGenerator:
+    """
+    Builds interlocking grids from a set of answers with a backtracking search.
+    Each step places the word with the fewest legal placements (fail-first),
+    candidate crossings come from the letter index instead of scanning every
+    word, and branches that cannot beat the best grid found so far are cut.
+    """
+    def __init__(self, vocabulary):
+        self.index = LetterIndex(w.lower() for w in vocabulary)
+
+    def generate(self, words, max_words=10, max_rows=12, max_cols=20, max_steps=STEP_BUDGET):
+        """
+        Places up to `max_words` of `words` (earlier words first) into one grid.
+        Returns the largest grid found within `max_steps` search steps; the
+        budget is a step count rather than a time limit so the same words
+        always give the same grid, however fast the machine is.
+        """
+        words = [w.lower() for w in dict.fromkeys(words) if len(w) <= max(max_rows, max_cols)]
+        if not words:
+            return None
+        self._target = min(max_words, len(words))
+        self._max_rows, self._max_cols = max_rows, max_cols
+        self._steps_left = max_steps
+        self._cells = {}
+        self._owners = {}
+        self._placed = []
+        self._best = []
+
+        first = max(words[:self._target], key=len)
+        direction = ACROSS if len(first) <= max_cols else DOWN
+        self._place(Placement(first, 0, 0, direction))
+        self._order = {w: i for i, w in enumerate(words)}
+        remaining = set(words)
+        remaining.discard(first)
+        self._search(remaining)
+        return CrosswordGrid(self._best)
+
+    def _search(self, remaining):
+        """Returns True once the search should stop: every word placed or the step budget is spent."""
+        if len(self._placed) > len(self._best):
+            self._best = list(self._placed)
+        if len(self._placed) == self._target:
+            return True
+        if min(self._target, len(self._placed) + len(remaining)) <= len(self._best):
+            return False
+        self._steps_left -= 1
+        if self._steps_left < 0:
+            return True
+
+        candidates = self._candidates(remaining)
+        if not candidates:
+            return False
+        word = min(candidates, key=lambda w: (len(candidates[w]), self._order[w]))
+        options = sorted(candidates[word], key=lambda item: -item[1])
+
+        remaining.discard(word)
+        for placement, _ in options:
+            added = self._place(placement)
+            done = self._search(remaining)
+            self._unplace(placement, added)
+            if done:
+                remaining.add(word)
+                return True
+        # Also try leaving this word out so the others still get a chance
+        done = self._search(remaining)
+        remaining.add(word)
+        return done
+
+    def _candidates(self, remaining):
+        """Legal placements for each remaining word that crosses the current grid."""
+        candidates = defaultdict(dict)
+        rows = [r for r, _ in self._cells]
+        cols = [c for _, c in self._cells]
+        self._bounds = min_row, max_row, min_col, max_col = (min(rows), max(rows), min(cols), max(cols))
+        for (row, col), letter in self._cells.items():
+            owner = self._owners[(row, col)]
+            if owner == ACROSS | DOWN:
+                continue
+            direction = DOWN if owner == ACROSS else ACROSS
+            # How far a word may extend before/after this cell and still fit the grid
+            if direction == ACROSS:
+                max_pos, max_tail = col - (max_col - self._max_cols + 1), (min_col + self._max_cols - 1) - col
+            else:
+                max_pos, max_tail = row - (max_row - self._max_rows + 1), (min_row + self._max_rows - 1) - row
+            for word, pos in self.index.crossings(letter, max_pos, max_tail):
+                if word not in remaining:
+                    continue
+                if direction == ACROSS:
+                    placement = Placement(word, row, col - pos, ACROSS)
+                else:
+                    placement = Placement(word, row - pos, col, DOWN)
+                if placement in candidates[word]:
+                    continue
+                self._steps_left -= 1
+                crossings = self._check(placement)
+                if crossings:
+                    candidates[word][placement] = crossings
+        return {word: list(options.items()) for word, options in candidates.items() if options}
+
+    def _check(self, placement):
+        """Returns the number of crossings for a legal placement, or 0 if it is illegal."""
+        cells = word_cells(placement)
+        dr, dc = (0, 1) if placement.direction == ACROSS else (1, 0)
+        before = (cells[0][0] - dr, cells[0][1] - dc)
+        after = (cells[-1][0] + dr, cells[-1][1] + dc)
+        if before in self._cells or after in self._cells:
+            return 0
+        if not self._fits(cells):
+            return 0
+
+        crossings = 0
+        for (row, col), letter in zip(cells, placement.word):
+            existing = self._cells.get((row, col))
+            if existing is not None:
+                if existing != letter or self._owners[(row, col)] & placement.direction:
+                    return 0
+                crossings += 1
+            else:
+                # Empty cells must not touch parallel neighbours, or stray words form
+                for neighbour in ((row + dc, col + dr), (row - dc, col - dr)):
+                    if neighbour in self._cells:
+                        return 0
+        return crossings
+
+    def _fits(self, cells):
+        min_row, max_row, min_col, max_col = self._bounds
+        (first_row, first_col), (last_row, last_col) = cells[0], cells[-1]
+        height = max(max_row, last_row) - min(min_row, first_row)
+        width = max(max_col, last_col) - min(min_col, first_col)
+        return height < self._max_rows and width < self._max_cols
+
+    def _place(self, placement):
+        added = []
+        for cell, letter in zip(word_cells(placement), placement.word):
+            if cell not in self._cells:
+                self._cells[cell] = letter
+                self._owners[cell] = 0
+                added.append(cell)
+            self._owners[cell] |= placement.direction
+        self._placed.append(placement)
+        return added
+
+    def _unplace(self, placement, added):
+        self._placed.pop()
+        for cell in word_cells(placement):
+            self._owners[cell] &= ~placement.direction
+        for cell in added:
+            del self._cells[cell]
+            del self._owners[cell]
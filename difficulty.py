@@ -0,0 +1,148 @@
+import math
+
+DEFAULT_PLAYER = "player"
+INITIAL_RATING = 1500.0
+# Prior question ratings for the hand-sorted difficulty levels
+LEVEL_RATINGS = {"easy": 1300.0, "medium": 1500.0, "hard": 1700.0}
+
+
+def expected_score(player_rating, question_rating):
+    """Elo probability that a player at `player_rating` solves a question at `question_rating`."""
+    return 1.0 / (1.0 + 10 ** ((question_rating - player_rating) / 400.0))
+
+
+class AdaptiveDifficulty:
+    """
+    Elo-style difficulty engine. Players and questions both carry a rating;
+    each answer moves the player's and the question's rating towards the
+    outcome in O(1), and keeps running per-question attempt/solve counts.
+
+    Questions are indexed by rating bucket (bucket -> set of keys), so picking
+    the next question only looks at the buckets nearest the target rating
+    instead of scanning the whole bank. An update that moves a question into
+    another bucket moves its key between two sets.
+    """
+    def __init__(self, bucket_width=50, k_player=32, k_question=16, target_probability=0.7, prior_weight=10):
+        self.bucket_width = bucket_width
+        self.k_player = k_player
+        self.k_question = k_question
+        self.target_probability = target_probability
+        self.prior_weight = prior_weight # Past attempts needed before history outweighs the prior rating
+        self.ratings = {}
+        self.attempts = {}
+        self.solved = {}
+        self.players = {}
+        self.history = {}
+        self.buckets = {}
+        self.low = self.high = 0 # Bounds on the occupied bucket numbers
+
+    def _bucket(self, rating):
+        return int(rating // self.bucket_width)
+
+    def _place(self, key, bucket):
+        self.buckets.setdefault(bucket, set()).add(key)
+        if len(self.ratings) == 1:
+            self.low = self.high = bucket
+        self.low, self.high = min(self.low, bucket), max(self.high, bucket)
+
+    def _move(self, key, old_rating, new_rating):
+        old, new = self._bucket(old_rating), self._bucket(new_rating)
+        if old != new:
+            bucket = self.buckets[old]
+            bucket.discard(key)
+            if not bucket:
+                del self.buckets[old]
+            self._place(key, new)
+
+    def load_history(self, rows):
+        """
+        Seeds solve counts from (key, attempts, solved) rows, e.g.
+        StatsStore.answer_totals(). Questions added afterwards start from
+        their prior rating blended with the rating their solve rate implies
+        against an average (INITIAL_RATING) player.
+        """
+        for key, attempts, solved in rows:
+            self.history[key] = (attempts, solved)
+
+    def add_question(self, key, rating=INITIAL_RATING):
+        if key in self.ratings:
+            return
+        attempts, solved = self.history.get(key, (0, 0))
+        if attempts:
+            implied = INITIAL_RATING + 400 * math.log10((attempts - solved + 1) / (solved + 1))
+            weight = attempts / (attempts + self.prior_weight)
+            rating = rating * (1 - weight) + implied * weight
+        self.ratings[key] = rating
+        self.attempts[key] = attempts
+        self.solved[key] = solved
+        self._place(key, self._bucket(rating))
+
+    def add_player(self, player=DEFAULT_PLAYER, rating=INITIAL_RATING):
+        """Registers `player`; an existing player keeps their current rating."""
+        self.players.setdefault(player, rating)
+
+    def player_rating(self, player=DEFAULT_PLAYER):
+        return self.players.get(player, INITIAL_RATING)
+
+    def solve_rate(self, key):
+        """Laplace-smoothed fraction of attempts at `key` that were solved."""
+        return (self.solved[key] + 1) / (self.attempts[key] + 2)
+
+    def update(self, key, solved, player=DEFAULT_PLAYER):
+        """Records one answer and returns the player's new rating."""
+        player_rating = self.player_rating(player)
+        question_rating = self.ratings[key]
+        surprise = (1.0 if solved else 0.0) - expected_score(player_rating, question_rating)
+
+        self.players[player] = player_rating + self.k_player * surprise
+        new_rating = question_rating - self.k_question * surprise
+        self.ratings[key] = new_rating
+        self._move(key, question_rating, new_rating)
+        self.attempts[key] += 1
+        self.solved[key] += bool(solved)
+        return self.players[player]
+
+    def target_rating(self, player=DEFAULT_PLAYER):
+        """Question rating the player solves with probability target_probability."""
+        p = self.target_probability
+        return self.player_rating(player) + 400 * math.log10((1 - p) / p)
+
+    def _outward(self, player):
+        """Yields (distance, bucket) for every occupied bucket, nearest to the target first."""
+        center = self._bucket(self.target_rating(player))
+        for distance in range(max(center - self.low, self.high - center) + 1):
+            for bucket in ((center,) if distance == 0 else (center - distance, center + distance)):
+                if self.buckets.get(bucket):
+                    yield distance, bucket
+
+    def nearest(self, limit, player=DEFAULT_PLAYER):
+        """Up to `limit` question keys, closest to the player's target rating first."""
+        keys = []
+        for _, bucket in self._outward(player):
+            keys.extend(sorted(self.buckets[bucket]))
+            if len(keys) >= limit:
+                break
+        return keys[:limit]
+
+    def select(self, rng, exclude=(), player=DEFAULT_PLAYER, prefer=None, window=1):
+        """
+        Picks a question key near the player's target rating, searching buckets
+        outward from the target. If `prefer` is given, keys it contains win
+        within `window` buckets of the nearest available question.
+        """
+        nearest = None
+        for distance, bucket in self._outward(player):
+            if nearest is not None and distance > nearest[0] + window:
+                break
+            candidates = sorted(key for key in self.buckets[bucket] if key not in exclude)
+            if not candidates:
+                continue
+            if prefer is not None:
+                preferred = [key for key in candidates if key in prefer]
+                if preferred:
+                    return rng.choice(preferred)
+            if nearest is None:
+                nearest = (distance, candidates)
+            if prefer is None:
+                return rng.choice(candidates)
+        return rng.choice(nearest[1]) if nearest else None
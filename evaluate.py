@@ -0,0 +1,258 @@
+import argparse
+import json
+import math
+import multiprocessing
+import time
+from itertools import islice
+
+from ngram_models import NGramModels
+from shared_model import SharedNGramModels
+
+_worker_model = None
+_worker_order = 3
+_worker_vocab = None
+
+
+class EvaluationResult:
+    """Aggregated log-probability and per-order hit counts over a corpus."""
+    def __init__(self):
+        self.sentences = 0
+        self.tokens = 0
+        self.log_prob = 0.0
+        self.oov = 0 # Targets outside the training vocabulary; left out of perplexity at every order
+        self.unk = 0 # Targets the model only knows as <unk>
+        self.hits = {'trigram': 0, 'bigram': 0, 'unigram': 0, 'unseen': 0}
+
+    def merge(self, other):
+        self.sentences += other.sentences
+        self.tokens += other.tokens
+        self.log_prob += other.log_prob
+        self.oov += other.oov
+        self.unk += other.unk
+        for name, count in other.hits.items():
+            self.hits[name] += count
+        return self
+
+    @property
+    def scored_tokens(self):
+        return self.tokens - self.oov
+
+    @property
+    def cross_entropy(self):
+        """Average negative log2 probability per scored token (bits)."""
+        if not self.scored_tokens:
+            return float('inf')
+        return -self.log_prob / (self.scored_tokens * math.log(2))
+
+    @property
+    def perplexity(self):
+        if not self.scored_tokens:
+            return float('inf')
+        return math.exp(-self.log_prob / self.scored_tokens)
+
+    def to_dict(self):
+        total = self.tokens or 1
+        return {
+            'sentences': self.sentences,
+            'tokens': self.tokens,
+            'oov': self.oov,
+            'oov_rate': self.oov / total,
+            'unk': self.unk,
+            'unk_rate': self.unk / total,
+            'log_prob': self.log_prob,
+            'cross_entropy_bits': self.cross_entropy,
+            'perplexity': self.perplexity,
+            'hits': dict(self.hits),
+            'hit_rates': {name: count / total for name, count in self.hits.items()},
+        }
+
+
+def score_sentence(model, sentence, order=3, result=None):
+    """
+    Adds the log probability of every token in `sentence` (plus </s>) to `result`.
+    Hit statistics record the highest order whose count was actually observed.
+    A target that a pruned model only knows as <unk> gets an equal share of the
+    <unk> probability per folded word type, so perplexity stays measured over
+    the original vocabulary and remains comparable with the unpruned model.
+
+    Targets never seen in training are counted as OOV and skipped at every
+    order: order 1 gives them probability 0 while add-one smoothing gives
+    them a real one at orders 2 and 3, so scoring them would make the orders
+    cover different tokens. Perplexity therefore excludes OOV targets.
+    `vocab` (the training vocabulary before pruning) keeps the OOV set of a
+    pruned model the same as the unpruned one's; by default a target is OOV
+    when the model has no unigram count for it.
+    """
+    return score_tokens(model, model.tokenizer.tokenize(sentence), order, result)
+
+
+def score_tokens(model, tokens, order=3, result=None, vocab=None):
+    result = result or EvaluationResult()
+    tokens = original = ['<s>'] + tokens + ['</s>']
+    folded = None
+    if model.unk_token is not None:
+        mapped = [model.map_unknown(token) for token in tokens]
+        folded = [m == model.unk_token and t != m for t, m in zip(tokens, mapped)]
+        tokens = mapped
+        unk_share = math.log(model.unk_types) if model.unk_types > 1 else 0.0
+    trigrams, bigrams, unigrams = model.trigrams, model.bigrams, model.unigrams
+    for i in range(1, len(tokens)):
+        word = tokens[i]
+        if order >= 3 and i >= 2 and trigrams.get((tokens[i-2], tokens[i-1], word), 0):
+            result.hits['trigram'] += 1
+        elif order >= 2 and bigrams.get((tokens[i-1], word), 0):
+            result.hits['bigram'] += 1
+        elif unigrams.get(word, 0):
+            result.hits['unigram'] += 1
+        else:
+            result.hits['unseen'] += 1
+
+        result.tokens += 1
+        if (original[i] not in vocab) if vocab is not None else not unigrams.get(word, 0):
+            result.oov += 1
+            continue
+        context = tokens[max(0, i - (order - 1)):i] if order > 1 else []
+        log_prob = model.log_probability(context, word)
+        if folded is not None and folded[i]:
+            result.unk += 1
+            log_prob -= unk_share
+        result.log_prob += log_prob
+    result.sentences += 1
+    return result
+
+
+def score_batch(model, sentences, order=3, vocab=None):
+    result = EvaluationResult()
+    # Lines from read_batches keep their newline, which would defeat the batched tokenizer
+    stripped = [s.strip() for s in sentences]
+    for tokens in model.tokenizer.tokenize_batch([s for s in stripped if s]):
+        score_tokens(model, tokens, order, result, vocab)
+    return result
+
+
+def _init_worker(model, order, vocab=None):
+    global _worker_model, _worker_order, _worker_vocab
+    _worker_model = model
+    _worker_order = order
+    _worker_vocab = vocab
+
+
+def _score_worker_batch(sentences):
+    return score_batch(_worker_model, sentences, _worker_order, _worker_vocab)
+
+
+def read_batches(path, batch_size):
+    """Streams a one-sentence-per-line file in lists of `batch_size` lines."""
+    with open(path, encoding='utf-8') as f:
+        while True:
+            batch = list(islice(f, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def read_corpus(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def evaluate(model, heldout_path, order=3, batch_size=1000, workers=1, shared=False, vocab=None):
+    """
+    Computes cross-entropy/perplexity of `model` over a held-out file.
+    With shared=True, workers attach to one shared memory copy of the counts
+    instead of each receiving a pickled copy of the model. `vocab` is passed
+    on to score_tokens.
+    """
+    result = EvaluationResult()
+    batches = read_batches(heldout_path, batch_size)
+    if workers <= 1:
+        for batch in batches:
+            result.merge(score_batch(model, batch, order, vocab))
+        return result
+
+    if shared:
+        with SharedNGramModels.publish(model) as shared_model:
+            return evaluate(shared_model, heldout_path, order, batch_size, workers, vocab=vocab)
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(model, order, vocab)) as pool:
+        for partial in pool.imap_unordered(_score_worker_batch, batches):
+            result.merge(partial)
+    return result
+
+
+def parse_min_count(value):
+    """Parses ORDER=COUNT, e.g. 3=2 keeps trigrams seen at least twice."""
+    try:
+        order, count = value.split('=')
+        return int(order), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ORDER=COUNT, got {value!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate an n-gram model on a held-out corpus")
+    parser.add_argument("train", help="training corpus, one sentence per line")
+    parser.add_argument("heldout", help="held-out corpus, one sentence per line")
+    parser.add_argument("--order", type=int, nargs='+', default=[3], choices=[1, 2, 3],
+                        help="model order(s) to evaluate")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--shared", action="store_true",
+                        help="serve the model to workers from shared memory instead of per-process copies")
+    parser.add_argument("--min-count", type=parse_min_count, action="append", default=[],
+                        metavar="ORDER=COUNT", help="prune n-grams of ORDER seen fewer than COUNT times")
+    parser.add_argument("--max-vocab", type=int, help="keep only the most frequent words, mapping the rest to <unk>")
+    parser.add_argument("--entropy-threshold", type=float, help="relative-entropy pruning threshold")
+    args = parser.parse_args(argv)
+    pruning = bool(args.min_count or args.max_vocab or args.entropy_threshold)
+
+    start = time.perf_counter()
+    model = NGramModels(read_corpus(args.train))
+    build_time = time.perf_counter() - start
+
+    report = {'build_seconds': build_time, 'vocab_size': len(model.vocab), 'orders': {}}
+    for order in args.order:
+        start = time.perf_counter()
+        result = evaluate(model, args.heldout, order, args.batch_size, args.workers, args.shared)
+        stats = result.to_dict()
+        stats['seconds'] = time.perf_counter() - start
+        report['orders'][order] = stats
+
+    if pruning:
+        vocab = frozenset(word for word, count in model.unigrams.items() if count) # Same OOV set after pruning
+        report['pruning'] = model.prune(dict(args.min_count), args.max_vocab, args.entropy_threshold)
+        report['pruned_orders'] = {}
+        for order in args.order:
+            result = evaluate(model, args.heldout, order, args.batch_size, args.workers, args.shared, vocab)
+            report['pruned_orders'][order] = result.to_dict()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+
+    print(f"Built model in {build_time:.2f}s, vocabulary size {report['vocab_size']}")
+    for order, stats in report['orders'].items():
+        hits = ", ".join(f"{name} {rate:.1%}" for name, rate in stats['hit_rates'].items())
+        print(f"order {order}: perplexity {stats['perplexity']:.2f} (excluding OOV), "
+              f"cross-entropy {stats['cross_entropy_bits']:.3f} bits, "
+              f"{stats['tokens']} tokens ({stats['oov']} OOV, {stats['oov_rate']:.1%}) in {stats['seconds']:.2f}s")
+        print(f"  hits: {hits}")
+
+    if pruning:
+        before, after = report['pruning']['before'], report['pruning']['after']
+        saved = report['pruning']['saved_bytes']
+        print(f"Pruning: {before['bytes'] / 1e6:.2f} MB -> {after['bytes'] / 1e6:.2f} MB "
+              f"(saved {saved / 1e6:.2f} MB, {saved / before['bytes']:.1%})")
+        print(f"  vocab {before['vocab']} -> {after['vocab']}, bigrams {before['bigrams']} -> "
+              f"{after['bigrams']}, trigrams {before['trigrams']} -> {after['trigrams']}")
+        for order, stats in report['pruned_orders'].items():
+            baseline = report['orders'][order]['perplexity']
+            print(f"  order {order}: perplexity {baseline:.2f} -> {stats['perplexity']:.2f} "
+                  f"({(stats['perplexity'] - baseline) / baseline:+.1%}), "
+                  f"<unk> targets {stats['unk_rate']:.1%}, OOV {stats['oov']}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 import random
 import time
+from crossword_grid import CrosswordGenerator
+from difficulty import LEVEL_RATINGS
+from tokenizer import Tokenizer
 
 class CrosswordGame:
     """Manages the state and logic of the crossword game."""
-    def __init__(self):
+    def __init__(self, seed=None, clock=time.time, engine=None):
+        self.rng = random.Random(seed)
+        self.clock = clock # Injectable so recorded sessions can be replayed
+        self.engine = engine # Optional AdaptiveDifficulty; picks questions across all levels by rating
         self.score = 0
         self.lives = 3
         self.base_time = 60 # Default base time
@@ -64,11 +70,25 @@ class CrosswordGame:
                 ("neuroscience explores brain", "functionality", 13),
             ]
         }
+        # Questions share the model tokenizer so prompts and answers are normalised the same way
+        self.tokenizer = Tokenizer()
         self.all_questions = {}
         for diff, q_list in self.sentences.items():
-            self.all_questions[diff] = [
-                {'sentence': s, 'answer': a, 'length': l} for s, a, l in q_list
-            ]
+            sentences = self.tokenizer.tokenize_batch([s for s, _, _ in q_list])
+            self.all_questions[diff] = []
+            for tokens, (_, a, l) in zip(sentences, q_list):
+                answer = self.tokenizer.normalize_word(a)
+                self.all_questions[diff].append({'sentence': " ".join(tokens), 'answer': answer, 'length': len(answer),
+                                                 'difficulty': diff})
+        self.questions_by_answer = {q['answer']: q for q_list in self.all_questions.values() for q in q_list}
+        if self.engine:
+            for answer, q in self.questions_by_answer.items():
+                self.engine.add_question(answer, LEVEL_RATINGS[q['difficulty']])
+        self.grid_generator = CrosswordGenerator(
+            q['answer'] for q_list in self.all_questions.values() for q in q_list
+        )
+        self.grid = None
+        self.revealed = set()
         
     def set_difficulty(self, difficulty):
         """Sets the game difficulty and associated timer."""
@@ -80,6 +100,20 @@ class CrosswordGame:
         elif difficulty == "hard":
             self.base_time = 30
         self.time_remaining = self.base_time
+        if self.engine:
+            # The chosen level only sets where a new player's rating starts
+            self.engine.add_player(rating=LEVEL_RATINGS[difficulty])
+        self.build_grid()
+
+    def build_grid(self):
+        """Lays out this game's answers as one interlocking crossword grid."""
+        answers = [q['answer'] for q in self.all_questions[self.difficulty]]
+        if self.engine:
+            # Build the grid from the words the engine is most likely to ask next
+            answers = self.engine.nearest(len(answers))
+        self.rng.shuffle(answers)
+        self.grid = self.grid_generator.generate(answers, max_words=self.max_rounds)
+        self.revealed = set()
     
     def get_new_question(self):
         """
@@ -89,36 +123,48 @@ class CrosswordGame:
         if self.round_number >= self.max_rounds or self.lives <= 0:
             return None
         
-        available_questions = [q for q in self.all_questions[self.difficulty] if q not in self.used_questions]
-        
-        if not available_questions:
-            return None # No more questions
-        
-        question = random.choice(available_questions)
+        if self.engine:
+            used = {q['answer'] for q in self.used_questions}
+            answer = self.engine.select(self.rng, exclude=used, prefer=self.grid.words if self.grid else None)
+            if answer is None:
+                return None # No more questions
+            question = self.questions_by_answer[answer]
+        else:
+            available_questions = [q for q in self.all_questions[self.difficulty] if q not in self.used_questions]
+
+            if not available_questions:
+                return None # No more questions
+
+            if self.grid:
+                # Ask about words that are in the grid first
+                in_grid = [q for q in available_questions if q['answer'] in self.grid.words]
+                available_questions = in_grid or available_questions
+
+            question = self.rng.choice(available_questions)
         self.used_questions.append(question)
         self.current_question = question
         self.round_number += 1
 
         # Generate wrong options
-        all_answers = [q['answer'] for q in self.all_questions[self.difficulty]]
+        all_answers = list(dict.fromkeys(q['answer'] for q in self.all_questions[question['difficulty']]))
         all_answers.remove(question['answer'])
-        wrong_options = random.sample(all_answers, 3)
+        wrong_options = self.rng.sample(all_answers, 3)
 
         options = [question['answer']] + wrong_options
-        random.shuffle(options)
+        self.rng.shuffle(options)
         
         self.current_question['options'] = options
         
         # Reset and start timer
         self.time_remaining = self.base_time
-        self.start_time = time.time()
+        self.start_time = self.clock()
         self.last_update = self.start_time
 
         return self.current_question
 
     def update_timer(self):
         """Updates the timer based on elapsed time and multiplier."""
-        current_time = time.time()
+        current_time = self.clock()
         elapsed = current_time - self.last_update
         self.time_remaining -= elapsed * self.time_multiplier
         self.last_update = current_time
@@ -128,6 +174,9 @@ class CrosswordGame:
         """Checks if the user's selected answer is correct."""
         if selected_option_index == -1:
             # Handle time's up scenario
+            self.revealed.add(self.current_question['answer'])
+            if self.engine:
+                self.engine.update(self.current_question['answer'], False)
             self.lives -= 1
             self.time_multiplier = 2.0
             correct_word = self.current_question['answer']
@@ -136,8 +185,12 @@ class CrosswordGame:
         
         selected_answer = self.current_question['options'][selected_option_index]
         correct_answer = self.current_question['answer']
+        self.revealed.add(correct_answer)
+        is_correct = self.tokenizer.normalize_word(selected_answer) == correct_answer
+        if self.engine:
+            self.engine.update(correct_answer, is_correct)
 
-        if selected_answer == correct_answer:
+        if is_correct:
             self.score += 1
             self.time_remaining += 30
             self.time_multiplier = 1.0
@@ -153,9 +206,12 @@ class CrosswordGame:
         """Checks if the game has ended."""
         return self.round_number >= self.max_rounds or self.lives <= 0
 
+    def has_won(self):
+        return self.round_number >= self.max_rounds and self.lives > 0
+
     def get_final_message(self):
         """Generates the final message based on the game outcome."""
-        if self.round_number >= self.max_rounds and self.lives > 0:
+        if self.has_won():
             return "CONGRATULATIONS! YOU WON THE CHALLENGE!"
         else:
             return "GAME OVER!"
\ No newline at end of file
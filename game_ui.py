@@ -1,265 +1,208 @@
 import pygame
-import sys
-from colors import Colors
-
-class PygameUI:
-    def __init__(self):
-        pygame.init()
-        self.width, self.height = 800, 600
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Crossword Sentence Challenge")
-        self.clock = pygame.time.Clock()
-        self.font_large = pygame.font.Font(None, 48)
-        self.font_medium = pygame.font.Font(None, 36)
-        self.font_small = pygame.font.Font(None, 24)
-        self.colors = Colors()
-        
-        # Load background image (optional)
+import pygame_ui
+from widgets import Label, Widget
+
+DARK_BLUE = (0, 0, 50)
+
+class TimerBar(Widget):
+    """Countdown bar over a dark track; the fill shrinks as time runs out."""
+    def __init__(self, rect, total=60):
+        super().__init__(rect)
+        self.total = total
+        self.fraction = 1.0
+
+    def set_time(self, time_remaining):
+        self.fraction = time_remaining / self.total
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, (50, 50, 100), self.rect)
+        pygame.draw.rect(surface, (0, 200, 100), (self.rect.x, self.rect.y, self.rect.width * self.fraction, self.rect.height))
+
+class InputBox(Widget):
+    """Typed-answer box that grows with its text."""
+    def __init__(self, rect, font, color):
+        super().__init__(rect)
+        self.min_width = self.rect.width
+        self.label = Label("", font, color, topleft=(self.rect.x + 5, self.rect.y + 5))
+        self.color = color
+
+    def set_text(self, text):
+        self.label.set_text(text)
+        self.rect.w = max(self.min_width, self.label.rect.width + 10)
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.color, self.rect, 2)
+        self.label.draw(surface)
+
+class PygameUI(pygame_ui.PygameUI):
+    """Typed-answer variant of the game UI, drawn over the background image."""
+    FONT_SIZES = dict(pygame_ui.PygameUI.FONT_SIZES, medium=36)
+
+    def __init__(self, profile=False, input_source=None, window_size=None, fullscreen=False, assets=None):
+        super().__init__(profile, input_source, size=(800, 600), window_size=window_size,
+                         fullscreen=fullscreen, assets=assets)
+
+    def set_window(self, window_size, fullscreen=False, transient=False):
+        super().set_window(window_size, fullscreen, transient)
+        # Load background image (optional); scaled once per viewport size and reused by every screen
         try:
-            self.background = pygame.image.load("background.jpg")
-            self.background = pygame.transform.scale(self.background, (self.width, self.height))
-        except:
+            self.background = self.assets.image("background.jpg", self.viewport.size, persist=not transient)
+        except (pygame.error, OSError):
             self.background = None
 
+    def new_screen(self, name, layout, **options):
+        options.setdefault('background', self.background or DARK_BLUE)
+        options.setdefault('border', False)
+        options.setdefault('selectable', False)
+        return super().new_screen(name, layout, **options)
+
+    def relayout(self, screen):
+        if screen.size != self.viewport.size:
+            screen.background = self.background or DARK_BLUE
+        super().relayout(screen)
+
+    def centered(self, screen, text, font, color, y):
+        return screen.add(Label(text, font, color, midtop=self.point(self.width // 2, y)))
+
+    def run_until_input(self, screen):
+        """Shows `screen` until any key or mouse button is pressed."""
+        def on_event(event, mouse_pos):
+            if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
+                return True
+
+        self.run_screen(screen, on_event, fps=30)
+
     def show_intro(self):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
-                    return
-
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-            else:
-                self.screen.fill((0, 0, 50))  # Dark blue background
-            
-            title = self.font_large.render("CROSSWORD SENTENCE CHALLENGE", True, self.colors.CYAN)
-            subtitle = self.font_medium.render("Complete the sentence with the missing word", True, self.colors.YELLOW)
-            instruction1 = self.font_small.render("You have 60 seconds for each word", True, self.colors.BLUE)
-            instruction2 = self.font_small.render("3 wrong answers and the game is over", True, self.colors.RED)
-            prompt = self.font_medium.render("Press any key to start...", True, self.colors.GREEN)
-            
-            self.screen.blit(title, (self.width//2 - title.get_width()//2, 100))
-            self.screen.blit(subtitle, (self.width//2 - subtitle.get_width()//2, 200))
-            self.screen.blit(instruction1, (self.width//2 - instruction1.get_width()//2, 250))
-            self.screen.blit(instruction2, (self.width//2 - instruction2.get_width()//2, 300))
-            self.screen.blit(prompt, (self.width//2 - prompt.get_width()//2, 400))
-            
-            pygame.display.flip()
-            self.clock.tick(30)
+        def layout(screen):
+            self.centered(screen, "CROSSWORD SENTENCE CHALLENGE", self.font_large, self.colors.CYAN, 100)
+            self.centered(screen, "Complete the sentence with the missing word", self.font_medium, self.colors.YELLOW, 200)
+            self.centered(screen, "You have 60 seconds for each word", self.font_small, self.colors.BLUE, 250)
+            self.centered(screen, "3 wrong answers and the game is over", self.font_small, self.colors.RED, 300)
+            self.centered(screen, "Press any key to start...", self.font_medium, self.colors.GREEN, 400)
+
+        def build(ui):
+            return ui.new_screen('intro', layout)
+
+        self.run_until_input(self.cached_screen('intro', build))
 
     def show_question(self, question, score, lives, time_remaining):
-        self.screen.fill((0, 0, 50))  # Dark blue background
-        
-        # Score and timer display
-        score_text = self.font_medium.render(f"Score: {score} | Lives: {lives}", True, self.colors.WHITE)
-        time_text = self.font_medium.render(f"Time: {time_remaining:.1f}s", True, 
-                                          self.colors.GREEN if time_remaining > 10 else self.colors.RED)
-        
-        # Question display
-        instruction = self.font_small.render("Complete the sentence (word length: {})".format(question['length']), 
-                                           True, self.colors.WHITE)
-        sentence_parts = question['sentence'].split("_____")
-        
-        # Render sentence with blank
-        part1 = self.font_medium.render(sentence_parts[0], True, self.colors.CYAN)
-        blank = self.font_medium.render("_____", True, self.colors.YELLOW)
-        part2 = self.font_medium.render(sentence_parts[1] if len(sentence_parts) > 1 else "", True, self.colors.CYAN)
-        
-        # Input box
-        input_box = pygame.Rect(300, 350, 200, 32)
-        color_inactive = pygame.Color('lightskyblue3')
-        color_active = pygame.Color('dodgerblue2')
-        color = color_active
+        colors = self.colors
+        timer = input_box = None
         text = ""
-        active = True
-        
-        # Timer animation variables
-        timer_width = 400 * (time_remaining / 60)
-        
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        return text
-                    elif event.key == pygame.K_BACKSPACE:
-                        text = text[:-1]
-                    else:
-                        text += event.unicode
-            
-            # Draw everything
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-            else:
-                self.screen.fill((0, 0, 50))
-            
-            # Draw timer bar
-            pygame.draw.rect(self.screen, (50, 50, 100), (200, 50, 400, 20))
-            pygame.draw.rect(self.screen, (0, 200, 100), (200, 50, timer_width, 20))
-            
-            self.screen.blit(score_text, (20, 20))
-            self.screen.blit(time_text, (self.width - time_text.get_width() - 20, 20))
-            self.screen.blit(instruction, (self.width//2 - instruction.get_width()//2, 150))
-            
-            # Draw sentence with blank
-            x_pos = self.width//2 - (part1.get_width() + blank.get_width() + part2.get_width())//2
-            self.screen.blit(part1, (x_pos, 250))
-            self.screen.blit(blank, (x_pos + part1.get_width(), 250))
-            if len(sentence_parts) > 1:
-                self.screen.blit(part2, (x_pos + part1.get_width() + blank.get_width(), 250))
-            
-            # Draw input box
-            txt_surface = self.font_medium.render(text, True, color)
-            width = max(200, txt_surface.get_width()+10)
-            input_box.w = width
-            pygame.draw.rect(self.screen, color, input_box, 2)
-            self.screen.blit(txt_surface, (input_box.x+5, input_box.y+5))
-            
-            pygame.display.flip()
-            self.clock.tick(30)
-            
+        remaining = time_remaining
+
+        def layout(screen):
+            nonlocal timer, input_box
+            timer = screen.add(TimerBar(self.rect(200, 50, 400, 20)), static=False)
+            timer.set_time(remaining)
+
+            # Score and timer display
+            screen.add(Label(f"Score: {score} | Lives: {lives}", self.font_medium, colors.WHITE, topleft=self.point(20, 20)))
+            screen.add(Label(f"Time: {time_remaining:.1f}s", self.font_medium,
+                             colors.GREEN if time_remaining > 10 else colors.RED, topright=self.point(self.width - 20, 20)))
+            self.centered(screen, "Complete the sentence (word length: {})".format(question['length']),
+                          self.font_small, colors.WHITE, 150)
+
+            # Render sentence with blank
+            sentence_parts = question['sentence'].split("_____")
+            part1 = Label(sentence_parts[0], self.font_medium, colors.CYAN)
+            blank = Label("_____", self.font_medium, colors.YELLOW)
+            part2 = Label(sentence_parts[1] if len(sentence_parts) > 1 else "", self.font_medium, colors.CYAN)
+            x_pos = self.px(self.width // 2) - (part1.rect.width + blank.rect.width + part2.rect.width) // 2
+            for part in (part1, blank, part2):
+                part.rect.topleft = (x_pos, self.px(250))
+                x_pos += part.rect.width
+                screen.add(part)
+
+            input_box = screen.add(InputBox(self.rect(300, 350, 200, 32), self.font_medium, pygame.Color('dodgerblue2')),
+                                   static=False)
+            input_box.set_text(text)
+
+        screen = self.new_screen('question', layout)
+
+        def on_event(event, mouse_pos):
+            nonlocal text
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_RETURN:
+                    return text
+                elif event.key == pygame.K_BACKSPACE:
+                    text = text[:-1]
+                else:
+                    text += event.unicode
+                input_box.set_text(text)
+
+        def on_frame():
+            nonlocal remaining
             # Update timer
-            new_time_remaining = max(0, time_remaining - 0.03)
-            if new_time_remaining <= 0:
+            remaining = max(0, remaining - 0.03)
+            if remaining <= 0:
                 return ""
-            time_remaining = new_time_remaining
-            timer_width = 400 * (time_remaining / 60)
+            timer.set_time(remaining)
+
+        return self.run_screen(screen, on_event, on_frame, fps=30)
 
     def show_feedback(self, message, duration=2):
-        start_time = pygame.time.get_ticks()
-        
-        while pygame.time.get_ticks() - start_time < duration * 1000:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-            
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-            else:
-                self.screen.fill((0, 0, 50))
-            
-            feedback = self.font_medium.render(message, True, self.colors.GREEN if "Correct" in message else self.colors.RED)
-            self.screen.blit(feedback, (self.width//2 - feedback.get_width()//2, self.height//2))
-            
-            pygame.display.flip()
-            self.clock.tick(30)
+        def layout(screen):
+            self.centered(screen, message, self.font_medium, self.colors.GREEN if "Correct" in message else self.colors.RED,
+                          self.height // 2)
+
+        screen = self.new_screen('feedback', layout)
+        start_time = self.input.ticks()
+
+        def on_frame():
+            if self.input.ticks() - start_time >= duration * 1000: return True
+
+        self.run_screen(screen, lambda event, mouse_pos: None, on_frame, fps=30)
 
     def show_game_over(self, score):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
-                    return
-
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-            else:
-                self.screen.fill((0, 0, 50))
-            
-            game_over = self.font_large.render("GAME OVER", True, self.colors.RED)
-            score_text = self.font_medium.render(f"Your final score: {score}", True, self.colors.YELLOW)
-            prompt = self.font_medium.render("Press any key to continue...", True, self.colors.GREEN)
-            
-            self.screen.blit(game_over, (self.width//2 - game_over.get_width()//2, 200))
-            self.screen.blit(score_text, (self.width//2 - score_text.get_width()//2, 300))
-            self.screen.blit(prompt, (self.width//2 - prompt.get_width()//2, 400))
-            
-            pygame.display.flip()
-            self.clock.tick(30)
+        def layout(screen):
+            self.centered(screen, "GAME OVER", self.font_large, self.colors.RED, 200)
+            self.centered(screen, f"Your final score: {score}", self.font_medium, self.colors.YELLOW, 300)
+            self.centered(screen, "Press any key to continue...", self.font_medium, self.colors.GREEN, 400)
+
+        self.run_until_input(self.new_screen('game_over', layout))
 
     def show_victory(self, score):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
-                    return
-
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-            else:
-                self.screen.fill((0, 0, 50))
-            
-            congrats = self.font_large.render("CONGRATULATIONS!", True, self.colors.GREEN)
-            score_text = self.font_medium.render(f"You completed all sentences with a score of {score}", True, self.colors.YELLOW)
-            prompt = self.font_medium.render("Press any key to continue...", True, self.colors.GREEN)
-            
-            self.screen.blit(congrats, (self.width//2 - congrats.get_width()//2, 200))
-            self.screen.blit(score_text, (self.width//2 - score_text.get_width()//2, 300))
-            self.screen.blit(prompt, (self.width//2 - prompt.get_width()//2, 400))
-            
-            pygame.display.flip()
-            self.clock.tick(30)
+        def layout(screen):
+            self.centered(screen, "CONGRATULATIONS!", self.font_large, self.colors.GREEN, 200)
+            self.centered(screen, f"You completed all sentences with a score of {score}", self.font_medium,
+                          self.colors.YELLOW, 300)
+            self.centered(screen, "Press any key to continue...", self.font_medium, self.colors.GREEN, 400)
+
+        self.run_until_input(self.new_screen('victory', layout))
 
     def main_menu(self):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_1:
-                        return "1"
-                    elif event.key == pygame.K_2:
-                        return "2"
-                    elif event.key == pygame.K_3:
-                        return "3"
-
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-            else:
-                self.screen.fill((0, 0, 50))
-            
-            title = self.font_large.render("MAIN MENU", True, self.colors.CYAN)
-            option1 = self.font_medium.render("1. Start Game", True, self.colors.WHITE)
-            option2 = self.font_medium.render("2. View Example Sentences", True, self.colors.WHITE)
-            option3 = self.font_medium.render("3. Exit", True, self.colors.WHITE)
-            
-            self.screen.blit(title, (self.width//2 - title.get_width()//2, 100))
-            self.screen.blit(option1, (self.width//2 - option1.get_width()//2, 250))
-            self.screen.blit(option2, (self.width//2 - option2.get_width()//2, 300))
-            self.screen.blit(option3, (self.width//2 - option3.get_width()//2, 350))
-            
-            pygame.display.flip()
-            self.clock.tick(30)
+        def layout(screen):
+            self.centered(screen, "MAIN MENU", self.font_large, self.colors.CYAN, 100)
+            self.centered(screen, "1. Start Game", self.font_medium, self.colors.WHITE, 250)
+            self.centered(screen, "2. View Example Sentences", self.font_medium, self.colors.WHITE, 300)
+            self.centered(screen, "3. Exit", self.font_medium, self.colors.WHITE, 350)
+
+        def build(ui):
+            return ui.new_screen('main_menu', layout)
+
+        def on_event(event, mouse_pos):
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_1:
+                    return "1"
+                elif event.key == pygame.K_2:
+                    return "2"
+                elif event.key == pygame.K_3:
+                    return "3"
+
+        return self.run_screen(self.cached_screen('main_menu', build), on_event, fps=30)
 
     def show_examples(self, corpus):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
-                    return
-
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-            else:
-                self.screen.fill((0, 0, 50))
-            
-            title = self.font_large.render("EXAMPLE SENTENCES", True, self.colors.CYAN)
-            self.screen.blit(title, (self.width//2 - title.get_width()//2, 50))
-            
+        def layout(screen):
+            self.centered(screen, "EXAMPLE SENTENCES", self.font_large, self.colors.CYAN, 50)
+
             y_pos = 120
             for i, sentence in enumerate(corpus[:5], 1):
-                text = self.font_small.render(f"{i}. {sentence}", True, self.colors.WHITE)
-                self.screen.blit(text, (50, y_pos))
+                screen.add(Label(f"{i}. {sentence}", self.font_small, self.colors.WHITE, topleft=self.point(50, y_pos)))
                 y_pos += 30
-            
-            count = self.font_small.render(f"Total sentences in game: {len(corpus)}", True, self.colors.YELLOW)
-            prompt = self.font_medium.render("Press any key to continue...", True, self.colors.GREEN)
-            
-            self.screen.blit(count, (50, y_pos + 20))
-            self.screen.blit(prompt, (self.width//2 - prompt.get_width()//2, self.height - 100))
-            
-            pygame.display.flip()
-            self.clock.tick(30)
\ No newline at end of file
+
+            screen.add(Label(f"Total sentences in game: {len(corpus)}", self.font_small, self.colors.YELLOW,
+                             topleft=self.point(50, y_pos + 20)))
+            self.centered(screen, "Press any key to continue...", self.font_medium, self.colors.GREEN, self.height - 100)
+
+        self.run_until_input(self.new_screen('examples', layout))
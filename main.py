@@ -1,73 +1,109 @@
+import argparse
+import os
 import pygame
-import sys
-from game_logic import CrosswordGame
-from pygame_ui import PygameUI, Button, show_instructions, play_game
+from assets import AssetCache
+from pygame_ui import PygameUI, add_menu_instructions, show_instructions, play_game
+from widgets import Label
+from difficulty import AdaptiveDifficulty
+from replay import InputRecorder, ReplayInput
+from stats_store import DEFAULT_PATH, StatsStore
 
-def main_menu(ui):
-    """Displays the main menu and handles user selection."""
-    buttons = [
-        Button(ui.width // 2 - 200, 300, 400, 60, "START NEW GAME", ui.font_medium, ui.colors),
-        Button(ui.width // 2 - 200, 380, 400, 60, "HOW TO PLAY", ui.font_medium, ui.colors),
-        Button(ui.width // 2 - 200, 460, 400, 60, "EXIT GAME", ui.font_medium, ui.colors)
-    ]
-    selected_button = 0
-
-    while True:
-        mouse_pos = pygame.mouse.get_pos()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected_button = (selected_button - 1) % 3
-                elif event.key == pygame.K_DOWN:
-                    selected_button = (selected_button + 1) % 3
-                elif event.key == pygame.K_RETURN:
-                    return str(selected_button + 1)
-                elif event.key >= pygame.K_1 and event.key <= pygame.K_3:
-                    return str(event.key - pygame.K_0)
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                for i, button in enumerate(buttons):
-                    if button.is_clicked(mouse_pos):
-                        return str(i + 1)
-
-        ui.screen.fill(ui.colors.WHITE)
-        pygame.draw.rect(ui.screen, ui.colors.BLACK, (0, 0, ui.width, ui.height), 5)
+def build_main_menu(ui):
+    def layout(screen):
+        screen.add(Label("CROSSWORD CHALLENGE", ui.font_title, ui.colors.BLACK, center=ui.point(ui.width // 2, 150)))
+        screen.add(Label("Complete the sentence, find the word!", ui.font_medium, ui.colors.DARK_GRAY,
+                         center=ui.point(ui.width // 2, 200)))
+        ui.menu_buttons(screen, ["START NEW GAME", "HOW TO PLAY", "EXIT GAME"])
+        add_menu_instructions(ui, screen)
 
-        title = ui.font_title.render("CROSSWORD CHALLENGE", True, ui.colors.BLACK)
-        title_rect = title.get_rect(center=(ui.width // 2, 150))
-        ui.screen.blit(title, title_rect)
+    return ui.new_screen('main_menu', layout)
 
-        subtitle = ui.font_medium.render("Complete the sentence, find the word!", True, ui.colors.DARK_GRAY)
-        subtitle_rect = subtitle.get_rect(center=(ui.width // 2, 200))
-        ui.screen.blit(subtitle, subtitle_rect)
-
-        for i, button in enumerate(buttons):
-            button.set_hover(button.is_clicked(mouse_pos))
-            button.set_selected(i == selected_button)
-            button.draw(ui.screen)
+def main_menu(ui):
+    """Displays the main menu and handles user selection."""
+    screen = ui.cached_screen('main_menu', build_main_menu)
+    screen.selected = 0
+    choice = ui.run_screen(screen, screen.handle_menu_event)
+    return str(choice + 1)
 
-        instruction1 = ui.font_small.render("Use arrow keys and ENTER, or click with mouse", True, ui.colors.DARK_GRAY)
-        instruction2 = ui.font_small.render("Or press 1, 2, or 3 for quick selection", True, ui.colors.DARK_GRAY)
-        ui.screen.blit(instruction1, (ui.width // 2 - instruction1.get_width() // 2, 600))
-        ui.screen.blit(instruction2, (ui.width // 2 - instruction2.get_width() // 2, 630))
+def parse_size(value):
+    try:
+        width, height = value.lower().split('x')
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
 
-        pygame.display.flip()
-        ui.clock.tick(60)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crossword Sentence Challenge")
+    parser.add_argument("--profile", action="store_true",
+                        help="enable frame/logic timers and the on-screen profiling overlay")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write profiling results to PATH on exit (.json or .csv)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record input events, clock readings and seeds to PATH")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a recorded session headlessly at maximum speed")
+    parser.add_argument("--stats", metavar="PATH",
+                        help=f"SQLite file for game stats and the leaderboard (default: {DEFAULT_PATH}, "
+                             "off while replaying)")
+    parser.add_argument("--no-stats", action="store_true", help="do not record game stats")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="pick questions from every level to match the player's rating")
+    parser.add_argument("--window", type=parse_size, metavar="WxH",
+                        help="initial window size; the 1200x800 layout is scaled to fit")
+    parser.add_argument("--fullscreen", action="store_true", help="start fullscreen (F11 toggles)")
+    parser.add_argument("--asset-cache", metavar="DIR",
+                        help="keep scaled images in DIR so later launches skip rescaling")
+    return parser.parse_args(argv)
 
 def main():
     """Entry point of the program."""
-    ui = PygameUI()
-    while True:
-        choice = main_menu(ui)
-        if choice == "1":
-            play_game(ui)
-        elif choice == "2":
-            show_instructions(ui)
-        elif choice == "3":
-            pygame.quit()
-            return
+    args = parse_args()
+    input_source = None
+    if args.replay:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        input_source = ReplayInput.load(args.replay)
+    elif args.record:
+        input_source = InputRecorder()
+    stats_path = args.stats or (None if args.replay else DEFAULT_PATH)
+    stats = StatsStore(stats_path) if stats_path and not args.no_stats else None
+    # Replays take their launch options from the recording: mouse positions depend on the window,
+    # and stats (and so the adaptive history) are off
+    if args.replay:
+        settings = input_source.settings
+    else:
+        settings = {'adaptive': args.adaptive, 'window': args.window, 'fullscreen': args.fullscreen}
+    if args.record and not args.replay:
+        input_source.settings = settings
+    window = settings.get('window')
+    ui = PygameUI(profile=args.profile or bool(args.profile_out), input_source=input_source, stats=stats,
+                  window_size=tuple(window) if window else None, fullscreen=settings.get('fullscreen', False),
+                  assets=AssetCache(args.asset_cache))
+    ui.profiler.show_overlay = args.profile
+    engine = None
+    if settings.get('adaptive'):
+        # Shared by every game in this run, so ratings carry over between games
+        engine = AdaptiveDifficulty()
+        if 'history' not in settings:
+            settings['history'] = stats.answer_totals() if stats else []
+        engine.load_history(settings['history'])
+    try:
+        while True:
+            choice = main_menu(ui)
+            if choice == "1":
+                play_game(ui, engine)
+            elif choice == "2":
+                show_instructions(ui)
+            elif choice == "3":
+                pygame.quit()
+                return
+    finally:
+        if args.record and not args.replay:
+            input_source.save(args.record)
+        if args.profile_out:
+            ui.profiler.export(args.profile_out)
+        if stats:
+            stats.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
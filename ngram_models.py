@@ -1,45 +1,195 @@
 import math
+import sys
 from collections import defaultdict
+from tokenizer import Tokenizer
+
+UNK = '<unk>'
+BOUNDARY_TOKENS = ('<s>', '</s>')
+
+def smoothed_probability(model, context, word):
+    """
+    Add-one smoothed trigram/bigram probability (MLE for unigrams) after
+    mapping unknown tokens to <unk>. Counts are only read through
+    model.unigrams/bigrams/trigrams.get(key, 0), so NGramModels and
+    SharedNGramModels share this one formula.
+    """
+    if model.unk_token is not None:
+        word = model.map_unknown(word)
+        context = [model.map_unknown(token) for token in context]
+    if len(context) == 2:  # Trigram
+        count = model.trigrams.get((context[0], context[1], word), 0) + 1
+        denominator = model.bigrams.get((context[0], context[1]), 0) + len(model.vocab)
+        return count / denominator if denominator else 0
+    elif len(context) == 1:  # Bigram
+        count = model.bigrams.get((context[0], word), 0) + 1
+        denominator = model.unigrams.get(context[0], 0) + len(model.vocab)
+        return count / denominator if denominator else 0
+    else:  # Unigram
+        return (model.unigrams.get(word, 0) / model.total_count) if model.total_count else 0
 
 class NGramModels:
-    def __init__(self, corpus):
+    def __init__(self, corpus, min_counts=None, max_vocab=None, entropy_threshold=None, tokenizer=None):
         self.corpus = corpus
+        self.tokenizer = tokenizer or Tokenizer()
         self.unigrams = defaultdict(int)
         self.bigrams = defaultdict(int)
         self.trigrams = defaultdict(int)
         self.vocab = set()
+        self.total_count = 0
+        self.unk_token = None # Set once pruning maps rare words to <unk>
+        self.unk_types = 0 # Number of word types folded into <unk>
+        self.prune_report = None
         self.build_ngram_models()
+        if min_counts or max_vocab or entropy_threshold:
+            self.prune_report = self.prune(min_counts, max_vocab, entropy_threshold)
 
     def build_ngram_models(self):
         """Build n-gram counts from corpus"""
-        for sentence in self.corpus:
-            tokens = ['<s>'] + sentence.split() + ['</s>']
-          
-            self.vocab.update(tokens)
-            # Unigrams
+        unigrams, bigrams, trigrams = self.unigrams, self.bigrams, self.trigrams
+        total = 0
+        for tokens in self.tokenizer.iter_token_lists(self.corpus):
+            # Slide over <s> tokens </s> without building a padded copy of the list
+            prev2, prev1 = None, '<s>'
+            unigrams['<s>'] += 1
             for token in tokens:
-                self.unigrams[token] += 1
-            # Bigrams
-            for i in range(len(tokens)-1):
-                self.bigrams[(tokens[i], tokens[i+1])] += 1
-            # Trigrams
-            for i in range(len(tokens)-2):
-                self.trigrams[(tokens[i], tokens[i+1], tokens[i+2])] += 1
+                unigrams[token] += 1
+                bigrams[(prev1, token)] += 1
+                if prev2 is not None:
+                    trigrams[(prev2, prev1, token)] += 1
+                prev2, prev1 = prev1, token
+            unigrams['</s>'] += 1
+            bigrams[(prev1, '</s>')] += 1
+            if prev2 is not None:
+                trigrams[(prev2, prev1, '</s>')] += 1
+            total += len(tokens) + 2
+        self.total_count += total
+        self.vocab.update(unigrams)
+
+    def map_unknown(self, token):
+        """Map out-of-vocabulary tokens to <unk> once the vocabulary is capped"""
+        if self.unk_token is None or token in self.vocab:
+            return token
+        return self.unk_token
 
     def calculate_probability(self, context, word):
         """Calculate probability using Markov assumption and MLE"""
-        if len(context) == 2:  # Trigram
-            count = self.trigrams.get((context[0], context[1], word), 0) + 1
-            denominator = self.bigrams.get((context[0], context[1]), 0) + len(self.vocab)
-            return count / denominator if denominator else 0
-        elif len(context) == 1:  # Bigram
-            count = self.bigrams.get((context[0], word), 0) + 1
-            denominator = self.unigrams.get(context[0], 0) + len(self.vocab)
-            return count / denominator if denominator else 0
-        else:  # Unigram
-            return (self.unigrams.get(word, 0) / sum(self.unigrams.values()))
+        return smoothed_probability(self, context, word)
 
     def log_probability(self, context, word):
         """Log probability to avoid underflow"""
         prob = self.calculate_probability(context, word)
-        return math.log(prob) if prob > 0 else float('-inf')
\ No newline at end of file
+        return math.log(prob) if prob > 0 else float('-inf')
+
+    def memory_usage(self):
+        """Estimated bytes held by the count tables and vocabulary"""
+        seen = set()
+        total = 0
+        for table in self._count_tables():
+            total += sys.getsizeof(table)
+            for key in table:
+                if isinstance(key, tuple):
+                    total += sys.getsizeof(key)
+                    words = key
+                else:
+                    words = (key,)
+                for word in words:
+                    if id(word) not in seen:
+                        seen.add(id(word))
+                        total += sys.getsizeof(word)
+        total += sys.getsizeof(self.vocab)
+        return total
+
+    def _count_tables(self):
+        return (self.unigrams, self.bigrams, self.trigrams)
+
+    def size_stats(self):
+        return {
+            'vocab': len(self.vocab),
+            'unigrams': len(self.unigrams),
+            'bigrams': len(self.bigrams),
+            'trigrams': len(self.trigrams),
+            'bytes': self.memory_usage(),
+        }
+
+    def prune(self, min_counts=None, max_vocab=None, entropy_threshold=None):
+        """
+        Shrink the model in place and return a before/after size report.
+        min_counts maps an order (1, 2, 3) to the smallest count that is kept;
+        unigrams below it, and words outside the max_vocab most frequent ones,
+        are merged into <unk>. entropy_threshold drops trigrams and bigrams whose
+        removal changes the model's relative entropy by less than the threshold.
+        Bigrams still used as the context of a kept trigram are never dropped,
+        so trigram denominators stay intact.
+        """
+        min_counts = min_counts or {}
+        before = self.size_stats()
+
+        if max_vocab is not None or min_counts.get(1, 0) > 1:
+            self._cap_vocabulary(max_vocab, min_counts.get(1, 0))
+
+        keep_trigrams = {}
+        for key, count in self.trigrams.items():
+            if count < min_counts.get(3, 0):
+                continue
+            if entropy_threshold and self._trigram_entropy(key, count) < entropy_threshold:
+                continue
+            keep_trigrams[key] = count
+        self.trigrams = defaultdict(int, keep_trigrams)
+
+        contexts = {(a, b) for a, b, _ in self.trigrams}
+        keep_bigrams = {}
+        for key, count in self.bigrams.items():
+            if key not in contexts:
+                if count < min_counts.get(2, 0):
+                    continue
+                if entropy_threshold and self._bigram_entropy(key, count) < entropy_threshold:
+                    continue
+            keep_bigrams[key] = count
+        self.bigrams = defaultdict(int, keep_bigrams)
+
+        after = self.size_stats()
+        return {'before': before, 'after': after, 'saved_bytes': before['bytes'] - after['bytes']}
+
+    def _trigram_entropy(self, key, count):
+        # Removing the trigram turns P = (c+1)/(C+V) into 1/(C+V), so the weighted
+        # relative entropy change is P(h) * P(w|h) * log(c+1).
+        context_count = self.bigrams.get((key[0], key[1]), 0)
+        p_context = context_count / self.total_count
+        p_word = (count + 1) / (context_count + len(self.vocab))
+        return p_context * p_word * math.log(count + 1)
+
+    def _bigram_entropy(self, key, count):
+        context_count = self.unigrams.get(key[0], 0)
+        p_context = context_count / self.total_count
+        p_word = (count + 1) / (context_count + len(self.vocab))
+        return p_context * p_word * math.log(count + 1)
+
+    def _cap_vocabulary(self, max_vocab, min_count):
+        """Keep the most frequent words and fold all other counts into <unk>"""
+        candidates = [(count, word) for word, count in self.unigrams.items()
+                      if word not in BOUNDARY_TOKENS and word != UNK and count >= min_count]
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        if max_vocab is not None:
+            candidates = candidates[:max_vocab]
+        keep = {word for _, word in candidates}
+        keep.update(BOUNDARY_TOKENS)
+        keep.add(UNK)
+
+        def mapped(token):
+            return token if token in keep else UNK
+
+        self.unk_types += sum(1 for word in self.unigrams if word not in keep)
+
+        unigrams = defaultdict(int)
+        for word, count in self.unigrams.items():
+            unigrams[mapped(word)] += count
+        bigrams = defaultdict(int)
+        for (a, b), count in self.bigrams.items():
+            bigrams[(mapped(a), mapped(b))] += count
+        trigrams = defaultdict(int)
+        for (a, b, c), count in self.trigrams.items():
+            trigrams[(mapped(a), mapped(b), mapped(c))] += count
+
+        self.unigrams, self.bigrams, self.trigrams = unigrams, bigrams, trigrams
+        self.vocab = keep
+        self.unk_token = UNK
\ No newline at end of file
@@ -0,0 +1,192 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+
+
+class _NullSection:
+    """Shared no-op context manager used when profiling is disabled."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class TimingStats:
+    """Running statistics and a fixed-width histogram for one timer."""
+    def __init__(self, bucket_ms=1.0, max_ms=100.0):
+        self.bucket_ms = bucket_ms
+        self.buckets = [0] * (int(max_ms / bucket_ms) + 1)  # last bucket is overflow
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        if ms < self.min:
+            self.min = ms
+        if ms > self.max:
+            self.max = ms
+        index = int(ms / self.bucket_ms)
+        self.buckets[min(index, len(self.buckets) - 1)] += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct):
+        """Approximate percentile (in ms) read from the histogram."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100.0
+        seen = 0
+        last = len(self.buckets) - 1
+        for i, n in enumerate(self.buckets[:last]):
+            seen += n
+            if seen >= target:
+                # Upper edge of the bucket, but never above the slowest sample seen
+                return min((i + 1) * self.bucket_ms, self.max)
+        return self.max # Overflow bucket: the histogram has no upper edge, the maximum is exact
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.mean, 3),
+            'min_ms': round(self.min, 3) if self.count else 0.0,
+            'max_ms': round(self.max, 3),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'bucket_ms': self.bucket_ms,
+            'histogram': self.buckets,
+        }
+
+
+class Profiler:
+    """
+    Lightweight timers for render phases, game logic calls and event handling.
+    When disabled, section() hands back a shared no-op object and tick() only
+    forwards to the pygame clock, so the instrumentation can stay in place.
+    """
+    def __init__(self, enabled=False, bucket_ms=1.0, max_ms=100.0, show_overlay=None):
+        self.enabled = enabled
+        # Off for export-only runs so overlay rendering does not end up in the timings
+        self.show_overlay = enabled if show_overlay is None else show_overlay
+        self.bucket_ms = bucket_ms
+        self.max_ms = max_ms
+        self.timers = {}
+        self.target_fps = 0
+        self.actual_fps = 0.0
+        self._fps_samples = []
+
+    def _stats(self, name):
+        stats = self.timers.get(name)
+        if stats is None:
+            stats = self.timers[name] = TimingStats(self.bucket_ms, self.max_ms)
+        return stats
+
+    def record(self, name, ms):
+        """Adds a single measurement (in milliseconds) to a named timer."""
+        if self.enabled:
+            self._stats(name).add(ms)
+
+    def section(self, name):
+        """Context manager timing the enclosed block under `name`."""
+        if not self.enabled:
+            return _NULL_SECTION
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stats(name).add((time.perf_counter() - start) * 1000.0)
+
+    def call(self, name, func, *args, **kwargs):
+        """Calls func(*args, **kwargs) and times it under `name`."""
+        if not self.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._stats(name).add((time.perf_counter() - start) * 1000.0)
+
+    def tick(self, clock, fps):
+        """Wraps clock.tick(fps), recording frame time and actual vs target FPS."""
+        frame_ms = clock.tick(fps)
+        if self.enabled:
+            self._stats('frame').add(frame_ms)
+            self.target_fps = fps
+            self.actual_fps = clock.get_fps()
+            self._fps_samples.append((fps, self.actual_fps))
+        return frame_ms
+
+    def draw_overlay(self, screen, font, colors):
+        """Draws a small timing panel in the top-left corner of the screen."""
+        if not (self.enabled and self.show_overlay):
+            return
+        import pygame
+        lines = [f"FPS: {self.actual_fps:.1f} / {self.target_fps}"]
+        for name in sorted(self.timers):
+            stats = self.timers[name]
+            lines.append(f"{name}: {stats.last:.2f}ms (avg {stats.mean:.2f}, max {stats.max:.2f})")
+
+        line_height = font.get_linesize()
+        width = max(font.size(line)[0] for line in lines) + 12
+        height = line_height * len(lines) + 8
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            panel.blit(font.render(line, True, colors.WHITE), (6, 4 + i * line_height))
+        screen.blit(panel, (8, 8))
+
+    def summary(self):
+        """Returns all collected statistics as a plain dict."""
+        fps = [actual for _, actual in self._fps_samples if actual > 0]
+        return {
+            'target_fps': self.target_fps,
+            'mean_actual_fps': round(sum(fps) / len(fps), 2) if fps else 0.0,
+            'min_actual_fps': round(min(fps), 2) if fps else 0.0,
+            'timers': {name: stats.to_dict() for name, stats in self.timers.items()},
+        }
+
+    def export_json(self, path):
+        """Writes the summary, including histograms, to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_csv(self, path):
+        """
+        Writes one row per (timer, histogram bucket) to a CSV file, preceded by
+        summary rows for target and actual FPS (in the `value` column).
+        """
+        summary = self.summary()
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['timer', 'bucket_start_ms', 'bucket_end_ms', 'count', 'mean_ms', 'p95_ms', 'value'])
+            for name in ('target_fps', 'mean_actual_fps', 'min_actual_fps'):
+                writer.writerow([name, '', '', len(self._fps_samples), '', '', summary[name]])
+            for name, stats in sorted(self.timers.items()):
+                mean, p95 = round(stats.mean, 3), stats.percentile(95)
+                for i, n in enumerate(stats.buckets):
+                    if n:
+                        end = (i + 1) * stats.bucket_ms if i < len(stats.buckets) - 1 else ''
+                        writer.writerow([name, i * stats.bucket_ms, end, n, mean, p95, ''])
+
+    def export(self, path):
+        """Exports to CSV or JSON depending on the file extension."""
+        if path.endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
@@ -1,412 +1,368 @@
 import pygame
 import sys
-import math
+from assets import AssetCache
+from colors import Colors
 from game_logic import CrosswordGame # Make sure to import CrosswordGame
-
-class Colors:
-    """A simple class to hold color constants for readability."""
-    WHITE = (255, 255, 255)
-    BLACK = (0, 0, 0)
-    GRAY = (128, 128, 128)
-    LIGHT_GRAY = (192, 192, 192)
-    DARK_GRAY = (64, 64, 64)
-    RED = (220, 20, 20)
-    GREEN = (20, 200, 20)
-    BLUE = (20, 20, 200)
-
-class Button:
-    """Represents a clickable button with hover and selected states."""
-    def __init__(self, x, y, width, height, text, font, colors):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
-        self.font = font
-        self.colors = colors
-        self.is_hovered = False
-        self.is_selected = False
-
-    def draw(self, screen):
-        # Button background
-        if self.is_selected:
-            pygame.draw.rect(screen, self.colors.DARK_GRAY, self.rect)
-            pygame.draw.rect(screen, self.colors.WHITE, self.rect, 3)
-        elif self.is_hovered:
-            pygame.draw.rect(screen, self.colors.LIGHT_GRAY, self.rect)
-            pygame.draw.rect(screen, self.colors.BLACK, self.rect, 2)
-        else:
-            pygame.draw.rect(screen, self.colors.WHITE, self.rect)
-            pygame.draw.rect(screen, self.colors.BLACK, self.rect, 2)
-
-        # Button text
-        text_color = self.colors.WHITE if self.is_selected else self.colors.BLACK
-        text_surface = self.font.render(self.text, True, text_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
-
-    def is_clicked(self, pos):
-        """Checks if a given mouse position is inside the button."""
-        return self.rect.collidepoint(pos)
-
-    def set_hover(self, is_hovered):
-        self.is_hovered = is_hovered
-    
-    def set_selected(self, is_selected):
-        self.is_selected = is_selected
+from profiler import Profiler
+from replay import LiveInput
+from widgets import Button, CrosswordView, Label, Panel, ProgressBar, Screen, WordRow
 
 class PygameUI:
     """Manages all Pygame UI elements and rendering logic."""
-    def __init__(self):
+    # Font sizes at the logical resolution; loaded at `scale` times these
+    FONT_SIZES = {'title': 64, 'large': 48, 'medium': 32, 'small': 24, 'tiny': 18}
+
+    def __init__(self, profile=False, input_source=None, size=(1200, 800), stats=None,
+                 window_size=None, fullscreen=False, assets=None):
         pygame.init()
-        self.width, self.height = 1200, 800
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        # Layouts are written at the logical size and scaled to the window by px()/point()/rect()
+        self.width, self.height = size
+        self.assets = assets or AssetCache()
+        self.colors = Colors()
+        self.windowed_size = tuple(window_size or size)
+        self.set_window(self.windowed_size, fullscreen)
         pygame.display.set_caption("Crossword Sentence Challenge")
         self.clock = pygame.time.Clock()
 
-        # Fonts
-        self.font_title = pygame.font.Font(None, 64)
-        self.font_large = pygame.font.Font(None, 48)
-        self.font_medium = pygame.font.Font(None, 32)
-        self.font_small = pygame.font.Font(None, 24)
-        self.font_tiny = pygame.font.Font(None, 18)
-
-        self.colors = Colors()
+        self.screens = {} # Screens whose content never changes are built once and reused
+        self.profiler = Profiler(enabled=profile)
+        self.input = input_source or LiveInput()
+        self.stats = stats # Optional StatsStore; None disables stats and the leaderboard
+
+    def set_window(self, window_size, fullscreen=False, transient=False):
+        """
+        (Re)opens the window and fits the logical layout into a centred,
+        letterboxed viewport at `scale` window pixels per logical pixel.
+        Screens draw straight onto the viewport with fonts loaded at the
+        scaled sizes; screens built for another size are laid out again
+        (see relayout) the next time they are shown. `transient` marks sizes
+        reached by resizing the window, which are not worth caching on disk.
+        """
+        self.fullscreen = fullscreen
+        if fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(window_size, pygame.RESIZABLE)
+        window_width, window_height = self.window.get_size()
+        self.scale = min(window_width / self.width, window_height / self.height)
+        view_size = (max(1, min(window_width, self.px(self.width))), max(1, min(window_height, self.px(self.height))))
+        self.viewport = pygame.Rect((0, 0), view_size)
+        self.viewport.center = (window_width // 2, window_height // 2)
+        self.window.fill(self.colors.BLACK)
+        self.screen = self.window.subsurface(self.viewport)
+        for name, font_size in self.FONT_SIZES.items():
+            setattr(self, f"font_{name}", self.assets.font(None, max(1, self.px(font_size))))
+
+    def toggle_fullscreen(self):
+        self.set_window(self.windowed_size, not self.fullscreen)
+
+    def resize(self, window_size):
+        if not self.fullscreen:
+            self.windowed_size = window_size
+            self.set_window(window_size, transient=True)
+
+    def px(self, value):
+        """A logical length in window pixels."""
+        return round(value * self.scale)
+
+    def point(self, x, y):
+        return (self.px(x), self.px(y))
+
+    def rect(self, x, y, width, height):
+        return pygame.Rect(self.px(x), self.px(y), self.px(width), self.px(height))
+
+    def to_view(self, pos):
+        """Maps a window position to viewport coordinates."""
+        return (pos[0] - self.viewport.x, pos[1] - self.viewport.y)
+
+    def handle_window_event(self, event):
+        """Handles resizing and the F11 fullscreen toggle; returns True if `event` was consumed."""
+        if event.type == pygame.VIDEORESIZE:
+            self.resize((event.w, event.h))
+            return True
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+            self.toggle_fullscreen()
+            return True
+        return False
+
+    def tick(self, fps):
+        """Advances the frame clock; replays run uncapped at maximum speed."""
+        return self.profiler.tick(self.clock, fps if self.input.realtime else 0)
+
+    def new_screen(self, name, layout, **options):
+        """
+        A screen the size of the viewport. layout(screen) adds its widgets
+        and is run again whenever the window size changes.
+        """
+        screen = Screen(name, self.viewport.size, self.colors, layout=layout, **options)
+        layout(screen)
+        return screen
+
+    def relayout(self, screen):
+        """Lays `screen` out again if it was built for another window size."""
+        size = self.viewport.size
+        if screen.size != size and not screen.resize(size):
+            screen.layout(screen)
+
+    def cached_screen(self, name, build):
+        """Returns the screen called `name`, building it with build(ui) the first time."""
+        if name not in self.screens:
+            screen = self.screens[name] = build(self)
+            screen.keep_sizes = 2 # e.g. both the windowed and the fullscreen layout
+        screen = self.screens[name]
+        self.relayout(screen)
+        return screen
+
+    def run_screen(self, screen, on_event, on_frame=None, fps=60):
+        """
+        Shared event/render loop. on_event(event, mouse_pos) and on_frame() return
+        None to keep going, anything else ends the loop and is returned.
+        """
+        profiler = self.profiler
+        sections = screen.sections
+        while True:
+            window_pos = self.input.mouse_pos()
+            mouse_pos = self.to_view(window_pos)
+            with profiler.section(sections['events']):
+                for event in self.input.events():
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        sys.exit()
+                    if self.handle_window_event(event):
+                        self.relayout(screen)
+                        mouse_pos = self.to_view(window_pos)
+                        continue
+                    result = on_event(event, mouse_pos)
+                    if result is not None:
+                        return result
+            if on_frame is not None:
+                with profiler.section(sections['update']):
+                    result = on_frame()
+                if result is not None:
+                    return result
+
+            with profiler.section(sections['render']):
+                screen.update_hover(mouse_pos)
+                screen.draw(self.screen, profiler)
+            profiler.draw_overlay(self.screen, self.font_tiny, self.colors)
+            with profiler.section(sections['flip']):
+                pygame.display.flip()
+            self.tick(fps)
+
+    def menu_buttons(self, screen, labels, top=300, step=80, width=400, height=60):
+        for i, text in enumerate(labels):
+            screen.add(Button(*self.rect(self.width // 2 - width // 2, top + i * step, width, height), text,
+                              self.font_medium, self.colors))
 
     def show_difficulty_selection(self):
         """Show difficulty selection with buttons."""
-        buttons = [
-            Button(self.width // 2 - 200, 300, 400, 60, "EASY - 60 seconds", self.font_medium, self.colors),
-            Button(self.width // 2 - 200, 380, 400, 60, "MEDIUM - 45 seconds", self.font_medium, self.colors),
-            Button(self.width // 2 - 200, 460, 400, 60, "HARD - 30 seconds", self.font_medium, self.colors)
-        ]
-        selected_button = 0
+        screen = self.cached_screen('difficulty', build_difficulty_screen)
+        screen.selected = 0
+        choice = self.run_screen(screen, screen.handle_menu_event)
+        return ["easy", "medium", "hard"][choice]
 
-        while True:
-            mouse_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        selected_button = (selected_button - 1) % 3
-                    elif event.key == pygame.K_DOWN:
-                        selected_button = (selected_button + 1) % 3
-                    elif event.key == pygame.K_RETURN:
-                        return ["easy", "medium", "hard"][selected_button]
-                    elif event.key >= pygame.K_1 and event.key <= pygame.K_3:
-                        return ["easy", "medium", "hard"][event.key - pygame.K_1]
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    for i, button in enumerate(buttons):
-                        if button.is_clicked(mouse_pos):
-                            return ["easy", "medium", "hard"][i]
-
-            self.screen.fill(self.colors.WHITE)
-            pygame.draw.rect(self.screen, self.colors.BLACK, (0, 0, self.width, self.height), 5)
-
-            title = self.font_title.render("SELECT DIFFICULTY", True, self.colors.BLACK)
-            title_rect = title.get_rect(center=(self.width // 2, 150))
-            self.screen.blit(title, title_rect)
-
-            for i, button in enumerate(buttons):
-                button.set_hover(button.is_clicked(mouse_pos))
-                button.set_selected(i == selected_button)
-                button.draw(self.screen)
-
-            instruction1 = self.font_small.render("Use arrow keys and ENTER, or click with mouse", True, self.colors.DARK_GRAY)
-            instruction2 = self.font_small.render("Or press 1, 2, or 3 for quick selection", True, self.colors.DARK_GRAY)
-            self.screen.blit(instruction1, (self.width // 2 - instruction1.get_width() // 2, 600))
-            self.screen.blit(instruction2, (self.width // 2 - instruction2.get_width() // 2, 630))
-
-            pygame.display.flip()
-            self.clock.tick(60)
-
-    def draw_crossword_grid(self, word_length, filled_letters="", correct_word="", show_solution=False):
-        """Draw a detailed crossword grid."""
-        cell_size = 50
-        grid_width = word_length * cell_size
-        start_x = (self.width - grid_width) // 2
-        start_y = 350
-
-        pygame.draw.rect(self.screen, self.colors.LIGHT_GRAY, (start_x - 10, start_y - 10, grid_width + 20, cell_size + 20))
-        pygame.draw.rect(self.screen, self.colors.BLACK, (start_x - 10, start_y - 10, grid_width + 20, cell_size + 20), 3)
-
-        for i in range(word_length):
-            x, y = start_x + i * cell_size, start_y
-            pygame.draw.rect(self.screen, self.colors.WHITE, (x, y, cell_size, cell_size))
-            pygame.draw.rect(self.screen, self.colors.BLACK, (x, y, cell_size, cell_size), 2)
-            number_surface = self.font_tiny.render(str(i + 1), True, self.colors.DARK_GRAY)
-            self.screen.blit(number_surface, (x + 2, y + 2))
-
-            if show_solution and i < len(correct_word):
-                letter_surface = self.font_large.render(correct_word[i].upper(), True, self.colors.BLACK)
-                letter_rect = letter_surface.get_rect(center=(x + cell_size // 2, y + cell_size // 2 + 5))
-                self.screen.blit(letter_surface, letter_rect)
-            elif i < len(filled_letters):
-                letter_surface = self.font_large.render(filled_letters[i].upper(), True, self.colors.BLACK)
-                letter_rect = letter_surface.get_rect(center=(x + cell_size // 2, y + cell_size // 2 + 5))
-                self.screen.blit(letter_surface, letter_rect)
-
-    def draw_game_info_panel(self, score, lives, game_round, time_remaining, time_multiplier, base_time):
-        """Draw comprehensive game info panel."""
+    def build_status_panel(self, screen, score, lives, game_round, time_remaining, time_multiplier, base_time):
+        """Adds the game status panel (score, lives, timer) to `screen`."""
         panel_width, panel_height = 350, 200
         panel_x, panel_y = self.width - panel_width - 20, 20
-
-        pygame.draw.rect(self.screen, self.colors.LIGHT_GRAY, (panel_x, panel_y, panel_width, panel_height))
-        pygame.draw.rect(self.screen, self.colors.BLACK, (panel_x, panel_y, panel_width, panel_height), 3)
-
-        title = self.font_medium.render("GAME STATUS", True, self.colors.BLACK)
-        self.screen.blit(title, (panel_x + 10, panel_y + 10))
+        screen.add(Panel(self.rect(panel_x, panel_y, panel_width, panel_height), self.colors.LIGHT_GRAY, self.colors.BLACK))
+        screen.add(Label("GAME STATUS", self.font_medium, self.colors.BLACK, topleft=self.point(panel_x + 10, panel_y + 10)))
 
         y_offset = 50
         info_items = [
-            f"Round: {game_round}/10",
-            f"Score: {score}",
-            f"Lives: {lives}",
-            f"Time: {int(time_remaining)}s"
+            (f"Round: {game_round}/10", self.colors.BLACK),
+            (f"Score: {score}", self.colors.BLACK),
+            (f"Lives: {lives}", self.colors.RED if lives <= 1 else self.colors.BLACK),
+            (f"Time: {int(time_remaining)}s", self.colors.RED if time_remaining < 10 else self.colors.BLACK),
         ]
-
-        for item in info_items:
-            text_color = self.colors.RED if "Lives:" in item and lives <= 1 else self.colors.BLACK
-            if "Time:" in item and time_remaining < 10:
-                text_color = self.colors.RED
-            text = self.font_small.render(item, True, text_color)
-            self.screen.blit(text, (panel_x + 20, panel_y + y_offset))
-            y_offset += 25
-
         if time_multiplier > 1.0:
-            speed_text = f"TIMER SPEED: {time_multiplier:.1f}x"
-            speed_surface = self.font_small.render(speed_text, True, self.colors.RED)
-            self.screen.blit(speed_surface, (panel_x + 20, panel_y + y_offset))
+            info_items.append((f"TIMER SPEED: {time_multiplier:.1f}x", self.colors.RED))
+        for text, color in info_items:
+            screen.add(Label(text, self.font_small, color, topleft=self.point(panel_x + 20, panel_y + y_offset)))
             y_offset += 25
 
-        bar_width, bar_height = 300, 20
-        bar_x, bar_y = panel_x + 25, panel_y + y_offset
-
-        pygame.draw.rect(self.screen, self.colors.WHITE, (bar_x, bar_y, bar_width, bar_height))
-        pygame.draw.rect(self.screen, self.colors.BLACK, (bar_x, bar_y, bar_width, bar_height), 2)
-
-        timer_percentage = max(0, min(1, time_remaining / base_time))
-        filled_width = int(bar_width * timer_percentage)
-        
         if time_remaining < 10:
             fill_color = self.colors.RED
         elif time_remaining < 20:
-            fill_color = (255, 165, 0)
+            fill_color = self.colors.ORANGE
         else:
             fill_color = self.colors.GREEN
+        screen.add(ProgressBar(self.rect(panel_x + 25, panel_y + y_offset, 300, 20), self.colors,
+                               time_remaining / base_time, fill_color))
 
-        if filled_width > 0:
-            pygame.draw.rect(self.screen, fill_color, (bar_x, bar_y, filled_width, bar_height))
-
-    def show_question(self, question, score, lives, game_round, time_remaining, time_multiplier, base_time):
+    def show_question(self, question, score, lives, game_round, time_remaining, time_multiplier, base_time,
+                      grid=None, revealed=()):
         """Show crossword question with proper UI."""
-        button_width, button_height = 400, 50
-        buttons = []
-        for i, option in enumerate(question['options']):
-            y_pos = 500 + i * 60
-            button = Button(
-                self.width // 2 - button_width // 2, y_pos, button_width, button_height,
-                f"{i+1}. {option.upper()}", self.font_medium, self.colors
-            )
-            buttons.append(button)
-
-        selected_option = 0
-        while True:
-            mouse_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP: selected_option = (selected_option - 1) % 4
-                    elif event.key == pygame.K_DOWN: selected_option = (selected_option + 1) % 4
-                    elif event.key == pygame.K_RETURN: return selected_option
-                    elif event.key >= pygame.K_1 and event.key <= pygame.K_4: return event.key - pygame.K_1
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    for i, button in enumerate(buttons):
-                        if button.is_clicked(mouse_pos): return i
+        if grid and question['answer'] not in grid.words:
+            grid = None
+        colors = self.colors
+
+        def layout(screen):
+            self.build_status_panel(screen, score, lives, game_round, time_remaining, time_multiplier, base_time)
+            screen.add(Label("COMPLETE THE SENTENCE", self.font_large, colors.BLACK, center=self.point(self.width // 2, 50)))
+            screen.add(Label(f'"{question["sentence"]} _____"', self.font_medium, colors.BLACK,
+                             center=self.point(self.width // 2, 120)))
+            screen.add(Label(f"Missing word has {question['length']} letters", self.font_small, colors.DARK_GRAY,
+                             center=self.point(self.width // 2, 160)))
+
+            # With a full grid the answers move to a right-hand column
+            if grid:
+                choices_x, choices_y = 900, 260
+                screen.add(Label("CROSSWORD GRID", self.font_medium, colors.BLACK, center=self.point(340, 210)))
+                view = screen.add(CrosswordView(grid, self.rect(40, 230, 600, 480), colors, self.font_tiny, self.scale))
+                view.set_state(revealed, question['answer'])
+            else:
+                choices_x, choices_y = self.width // 2, 450
+                screen.add(Label("CROSSWORD GRID", self.font_medium, colors.BLACK, center=self.point(self.width // 2, 250)))
+                screen.add(WordRow(question['length'], *self.point(self.width // 2, 350), colors, self.font_tiny,
+                                   self.font_large, cell_size=self.px(50)))
+
+            screen.add(Label("CHOOSE YOUR ANSWER:", self.font_medium, colors.BLACK, center=self.point(choices_x, choices_y)))
+            button_width, button_height = 400, 50
+            for i, option in enumerate(question['options']):
+                screen.add(Button(*self.rect(choices_x - button_width // 2, choices_y + 50 + i * 60, button_width,
+                                             button_height), f"{i+1}. {option.upper()}", self.font_medium, colors))
+            screen.add(Label("Use arrow keys + ENTER, number keys 1-4, or click", self.font_small, colors.DARK_GRAY,
+                             center=self.point(self.width // 2, 750)))
+
+        screen = self.new_screen('question', layout)
+
+        def on_frame():
             if time_remaining <= 0: return -1
 
-            self.screen.fill(self.colors.WHITE)
-            pygame.draw.rect(self.screen, self.colors.BLACK, (0, 0, self.width, self.height), 5)
-            self.draw_game_info_panel(score, lives, game_round, time_remaining, time_multiplier, base_time)
-
-            title = self.font_large.render("COMPLETE THE SENTENCE", True, self.colors.BLACK)
-            title_rect = title.get_rect(center=(self.width // 2, 50))
-            self.screen.blit(title, title_rect)
-
-            sentence_text = f'"{question["sentence"]} _____"'
-            sentence_surface = self.font_medium.render(sentence_text, True, self.colors.BLACK)
-            sentence_rect = sentence_surface.get_rect(center=(self.width // 2, 120))
-            self.screen.blit(sentence_surface, sentence_rect)
-
-            hint_text = f"Missing word has {question['length']} letters"
-            hint_surface = self.font_small.render(hint_text, True, self.colors.DARK_GRAY)
-            hint_rect = hint_surface.get_rect(center=(self.width // 2, 160))
-            self.screen.blit(hint_surface, hint_rect)
-
-            crossword_title = self.font_medium.render("CROSSWORD GRID", True, self.colors.BLACK)
-            crossword_title_rect = crossword_title.get_rect(center=(self.width // 2, 250))
-            self.screen.blit(crossword_title, crossword_title_rect)
-            self.draw_crossword_grid(question['length'])
-
-            choices_title = self.font_medium.render("CHOOSE YOUR ANSWER:", True, self.colors.BLACK)
-            choices_rect = choices_title.get_rect(center=(self.width // 2, 450))
-            self.screen.blit(choices_title, choices_rect)
-
-            for i, button in enumerate(buttons):
-                button.set_hover(button.is_clicked(mouse_pos))
-                button.set_selected(i == selected_option)
-                button.draw(self.screen)
-
-            instruction = self.font_small.render("Use arrow keys + ENTER, number keys 1-4, or click", True, self.colors.DARK_GRAY)
-            instruction_rect = instruction.get_rect(center=(self.width // 2, 750))
-            self.screen.blit(instruction, instruction_rect)
-
-            pygame.display.flip()
-            self.clock.tick(30)
+        return self.run_screen(screen, screen.handle_menu_event, on_frame, fps=30)
 
     def show_feedback(self, message, is_correct, correct_word="", duration=3):
         """Show feedback with crossword solution."""
-        start_time = pygame.time.get_ticks()
-        while pygame.time.get_ticks() - start_time < duration * 1000:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN: return
-
-            self.screen.fill(self.colors.WHITE)
-            pygame.draw.rect(self.screen, self.colors.BLACK, (0, 0, self.width, self.height), 5)
-            color = self.colors.GREEN if is_correct else self.colors.RED
-            result_text = "CORRECT!" if is_correct else "WRONG!"
-            feedback_surface = self.font_title.render(result_text, True, color)
-            feedback_rect = feedback_surface.get_rect(center=(self.width // 2, 200))
-            self.screen.blit(feedback_surface, feedback_rect)
+        colors = self.colors
+
+        def layout(screen):
+            screen.add(Label("CORRECT!" if is_correct else "WRONG!", self.font_title,
+                             colors.GREEN if is_correct else colors.RED, center=self.point(self.width // 2, 200)))
 
             if correct_word:
-                solution_text = self.font_large.render("CORRECT ANSWER:", True, self.colors.BLACK)
-                solution_rect = solution_text.get_rect(center=(self.width // 2, 300))
-                self.screen.blit(solution_text, solution_rect)
-                self.draw_crossword_grid(len(correct_word), correct_word=correct_word, show_solution=True)
-                word_display = self.font_large.render(correct_word.upper(), True, self.colors.BLACK)
-                word_rect = word_display.get_rect(center=(self.width // 2, 450))
-                self.screen.blit(word_display, word_rect)
+                screen.add(Label("CORRECT ANSWER:", self.font_large, colors.BLACK, center=self.point(self.width // 2, 300)))
+                screen.add(WordRow(len(correct_word), *self.point(self.width // 2, 350), colors, self.font_tiny,
+                                   self.font_large, letters=correct_word, cell_size=self.px(50)))
+                screen.add(Label(correct_word.upper(), self.font_large, colors.BLACK, center=self.point(self.width // 2, 450)))
 
             if "!" in message:
                 extra_msg = message.split("!")[1].strip()
                 if extra_msg:
-                    extra_surface = self.font_medium.render(extra_msg, True, self.colors.BLACK)
-                    extra_rect = extra_surface.get_rect(center=(self.width // 2, 500))
-                    self.screen.blit(extra_surface, extra_rect)
-            
-            skip_text = self.font_small.render("Press any key to continue...", True, self.colors.DARK_GRAY)
-            skip_rect = skip_text.get_rect(center=(self.width // 2, 600))
-            self.screen.blit(skip_text, skip_rect)
-
-            pygame.display.flip()
-            self.clock.tick(30)
-
-    def show_game_over(self, score, final_message):
-        """Show game over screen with final stats."""
-        button = Button(self.width // 2 - 200, 500, 400, 60, "RETURN TO MAIN MENU", self.font_medium, self.colors)
-        while True:
-            mouse_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN or (event.type == pygame.MOUSEBUTTONDOWN and button.is_clicked(mouse_pos)):
-                    return
-
-            self.screen.fill(self.colors.WHITE)
-            pygame.draw.rect(self.screen, self.colors.BLACK, (0, 0, self.width, self.height), 5)
-
-            color = self.colors.GREEN if "CONGRATULATIONS" in final_message else self.colors.RED
-            message_surface = self.font_title.render(final_message, True, color)
-            message_rect = message_surface.get_rect(center=(self.width // 2, 200))
-            self.screen.blit(message_surface, message_rect)
-
-            score_text = f"FINAL SCORE: {score}/10"
-            score_surface = self.font_large.render(score_text, True, self.colors.BLACK)
-            score_rect = score_surface.get_rect(center=(self.width // 2, 300))
-            self.screen.blit(score_surface, score_rect)
-
-            if score >= 8: rating, rating_color = "EXCELLENT!", self.colors.GREEN
-            elif score >= 6: rating, rating_color = "GOOD JOB!", self.colors.BLACK
-            elif score >= 4: rating, rating_color = "NOT BAD!", self.colors.BLACK
-            else: rating, rating_color = "KEEP TRYING!", self.colors.RED
-            
-            rating_surface = self.font_medium.render(rating, True, rating_color)
-            rating_rect = rating_surface.get_rect(center=(self.width // 2, 350))
-            self.screen.blit(rating_surface, rating_rect)
-
-            button.set_hover(button.is_clicked(mouse_pos))
-            button.draw(self.screen)
-
-            pygame.display.flip()
-            self.clock.tick(60)
+                    screen.add(Label(extra_msg, self.font_medium, colors.BLACK, center=self.point(self.width // 2, 500)))
+            screen.add(Label("Press any key to continue...", self.font_small, colors.DARK_GRAY,
+                             center=self.point(self.width // 2, 600)))
+
+        screen = self.new_screen('feedback', layout, selectable=False)
+        start_time = self.input.ticks()
+
+        def on_event(event, mouse_pos):
+            if event.type == pygame.KEYDOWN: return True
+
+        def on_frame():
+            if self.input.ticks() - start_time >= duration * 1000: return True
+
+        self.run_screen(screen, on_event, on_frame, fps=30)
+
+    def show_game_over(self, score, final_message, leaderboard=None, session_id=None):
+        """Show game over screen with final stats and, if given, the top scores."""
+        colors = self.colors
+        top = 120 if leaderboard else 200
+        color = colors.GREEN if "CONGRATULATIONS" in final_message else colors.RED
+        if score >= 8: rating, rating_color = "EXCELLENT!", colors.GREEN
+        elif score >= 6: rating, rating_color = "GOOD JOB!", colors.BLACK
+        elif score >= 4: rating, rating_color = "NOT BAD!", colors.BLACK
+        else: rating, rating_color = "KEEP TRYING!", colors.RED
+
+        def layout(screen):
+            screen.add(Label(final_message, self.font_title, color, center=self.point(self.width // 2, top)))
+            screen.add(Label(f"FINAL SCORE: {score}/10", self.font_large, colors.BLACK,
+                             center=self.point(self.width // 2, top + 80)))
+            screen.add(Label(rating, self.font_medium, rating_color, center=self.point(self.width // 2, top + 130)))
+            if leaderboard:
+                add_leaderboard(self, screen, leaderboard, session_id, top + 160)
+            screen.add(Button(*self.rect(self.width // 2 - 200, 500, 400, 60), "RETURN TO MAIN MENU", self.font_medium, colors))
+
+        screen = self.new_screen('game_over', layout, selectable=False)
+
+        def on_event(event, mouse_pos):
+            if event.type == pygame.KEYDOWN or (event.type == pygame.MOUSEBUTTONDOWN and screen.button_at(mouse_pos)):
+                return True
+
+        self.run_screen(screen, on_event)
+
+def add_leaderboard(ui, screen, rows, session_id, y, width=500):
+    """Top scores panel; the row for `session_id` is highlighted."""
+    x = ui.width // 2 - width // 2
+    screen.add(Panel(ui.rect(x, y, width, 40 + 22 * len(rows)), ui.colors.LIGHT_GRAY, ui.colors.BLACK, 2))
+    screen.add(Label("TOP SCORES", ui.font_small, ui.colors.BLACK, midtop=ui.point(ui.width // 2, y + 10)))
+    for i, (row_id, score, rounds, won, _) in enumerate(rows):
+        color = ui.colors.GREEN if row_id == session_id else ui.colors.BLACK
+        text = f"{i + 1}. {score}/{rounds}" + ("  WON" if won else "")
+        screen.add(Label(text, ui.font_small, color, topleft=ui.point(x + 30, y + 34 + 22 * i)))
+
+def build_difficulty_screen(ui):
+    def layout(screen):
+        screen.add(Label("SELECT DIFFICULTY", ui.font_title, ui.colors.BLACK, center=ui.point(ui.width // 2, 150)))
+        ui.menu_buttons(screen, ["EASY - 60 seconds", "MEDIUM - 45 seconds", "HARD - 30 seconds"])
+        add_menu_instructions(ui, screen)
+
+    return ui.new_screen('difficulty', layout)
+
+def add_menu_instructions(ui, screen):
+    instructions = ["Use arrow keys and ENTER, or click with mouse", "Or press 1, 2, or 3 for quick selection"]
+    for text, y in zip(instructions, (600, 630)):
+        screen.add(Label(text, ui.font_small, ui.colors.DARK_GRAY, midtop=ui.point(ui.width // 2, y)))
+
+def add_text_panel(ui, screen, x, y, width, height, title, lines):
+    """A titled light-gray panel of lines; bullet lines use the smaller gray font."""
+    screen.add(Panel(ui.rect(x, y, width, height), ui.colors.LIGHT_GRAY, ui.colors.BLACK))
+    screen.add(Label(title, ui.font_medium, ui.colors.BLACK, topleft=ui.point(x + 20, y + 20)))
+    y_pos = y + 60
+    for line in lines:
+        if not line: y_pos += 15; continue
+        bullet = line.startswith("•")
+        color = ui.colors.DARK_GRAY if bullet else ui.colors.BLACK
+        font = ui.font_tiny if bullet else ui.font_small
+        screen.add(Label(line, font, color, topleft=ui.point(x + 30, y_pos))); y_pos += 20
+
+def build_instructions_screen(ui):
+    panel_width, panel_height, panel_y = 550, 450, 120
+    left_panel_x, right_panel_x = 50, ui.width - panel_width - 50
+    rules = [ "• Complete 10 sentence puzzles", "• Find the missing word in each sentence", "• Choose from 4 multiple choice options", "• You have 3 lives total", "", "TIMER SYSTEM:", "• Correct answer: +30 seconds", "• Wrong answer: Timer goes 2x faster", "• Timer resets to normal speed after correct answer", "", "DIFFICULTY LEVELS:", "• Easy: 60 seconds base time, simple words", "• Medium: 45 seconds base time", "• Hard: 30 seconds base time, complex words", "", "WIN CONDITION:", "Complete all 10 rounds to win!" ]
+    controls = [ "KEYBOARD CONTROLS:", "• Arrow Keys (Up/Down): Navigate menu options", "• ENTER: Select an option", "• Number Keys (1-4): Quick selection of options", "", "MOUSE CONTROLS:", "• Click: Select a button or option" ]
+
+    def layout(screen):
+        screen.add(Label("HOW TO PLAY", ui.font_title, ui.colors.BLACK, center=ui.point(ui.width // 2, 60)))
+        add_text_panel(ui, screen, left_panel_x, panel_y, panel_width, panel_height, "GAME RULES", rules)
+        add_text_panel(ui, screen, right_panel_x, panel_y, panel_width, panel_height, "CONTROLS", controls)
+        screen.add(Button(*ui.rect(ui.width // 2 - 150, 650, 300, 50), "BACK TO MENU", ui.font_medium, ui.colors))
+
+    return ui.new_screen('instructions', layout, selectable=False)
 
 def show_instructions(ui):
     """
     Displays the game instructions screen with a two-panel layout.
     """
-    back_button = Button(ui.width // 2 - 150, 650, 300, 50, "BACK TO MENU", ui.font_medium, ui.colors)
-    while True:
-        mouse_pos = pygame.mouse.get_pos()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
-            if event.type == pygame.KEYDOWN or (event.type == pygame.MOUSEBUTTONDOWN and back_button.is_clicked(mouse_pos)): return
-
-        ui.screen.fill(ui.colors.WHITE)
-        pygame.draw.rect(ui.screen, ui.colors.BLACK, (0, 0, ui.width, ui.height), 5)
-        title = ui.font_title.render("HOW TO PLAY", True, ui.colors.BLACK)
-        title_rect = title.get_rect(center=(ui.width // 2, 60))
-        ui.screen.blit(title, title_rect)
-
-        panel_width, panel_height, panel_y = 550, 450, 120
-        left_panel_x, right_panel_x = 50, ui.width - panel_width - 50
-
-        # --- Left Panel: Game Rules ---
-        pygame.draw.rect(ui.screen, ui.colors.LIGHT_GRAY, (left_panel_x, panel_y, panel_width, panel_height))
-        pygame.draw.rect(ui.screen, ui.colors.BLACK, (left_panel_x, panel_y, panel_width, panel_height), 3)
-        rules_title = ui.font_medium.render("GAME RULES", True, ui.colors.BLACK)
-        ui.screen.blit(rules_title, (left_panel_x + 20, panel_y + 20))
-        rules = [ "• Complete 10 sentence puzzles", "• Find the missing word in each sentence", "• Choose from 4 multiple choice options", "• You have 3 lives total", "", "TIMER SYSTEM:", "• Correct answer: +30 seconds", "• Wrong answer: Timer goes 2x faster", "• Timer resets to normal speed after correct answer", "", "DIFFICULTY LEVELS:", "• Easy: 60 seconds base time, simple words", "• Medium: 45 seconds base time", "• Hard: 30 seconds base time, complex words", "", "WIN CONDITION:", "Complete all 10 rounds to win!" ]
-        y_pos = panel_y + 60
-        for rule in rules:
-            if not rule: y_pos += 15; continue
-            color = ui.colors.BLACK if not rule.startswith("•") else ui.colors.DARK_GRAY
-            rule_font = ui.font_small if not rule.startswith("•") else ui.font_tiny
-            text = rule_font.render(rule, True, color)
-            ui.screen.blit(text, (left_panel_x + 30, y_pos)); y_pos += 20
-
-        # --- Right Panel: Controls ---
-        pygame.draw.rect(ui.screen, ui.colors.LIGHT_GRAY, (right_panel_x, panel_y, panel_width, panel_height))
-        pygame.draw.rect(ui.screen, ui.colors.BLACK, (right_panel_x, panel_y, panel_width, panel_height), 3)
-        controls_title = ui.font_medium.render("CONTROLS", True, ui.colors.BLACK)
-        ui.screen.blit(controls_title, (right_panel_x + 20, panel_y + 20))
-        controls = [ "KEYBOARD CONTROLS:", "• Arrow Keys (Up/Down): Navigate menu options", "• ENTER: Select an option", "• Number Keys (1-4): Quick selection of options", "", "MOUSE CONTROLS:", "• Click: Select a button or option" ]
-        y_pos = panel_y + 60
-        for control in controls:
-            if not control: y_pos += 15; continue
-            color = ui.colors.BLACK if not control.startswith("•") else ui.colors.DARK_GRAY
-            control_font = ui.font_small if not control.startswith("•") else ui.font_tiny
-            text = control_font.render(control, True, color)
-            ui.screen.blit(text, (right_panel_x + 30, y_pos)); y_pos += 20
-        
-        back_button.set_hover(back_button.is_clicked(mouse_pos))
-        back_button.draw(ui.screen)
-        pygame.display.flip()
-        ui.clock.tick(60)
-
-def play_game(ui):
-    """Main game loop for a new game session."""
-    game = CrosswordGame()
+    screen = ui.cached_screen('instructions', build_instructions_screen)
+
+    def on_event(event, mouse_pos):
+        if event.type == pygame.KEYDOWN or (event.type == pygame.MOUSEBUTTONDOWN and screen.button_at(mouse_pos)):
+            return True
+
+    ui.run_screen(screen, on_event)
+
+def play_game(ui, engine=None):
+    """Main game loop for a new game session; `engine` turns on adaptive question selection."""
+    game_seed = ui.input.seed()
+    game = CrosswordGame(seed=game_seed, clock=ui.input.time, engine=engine)
     difficulty = ui.show_difficulty_selection()
     game.set_difficulty(difficulty)
+    stats = ui.stats
+    session_id = stats.start_session(difficulty, game_seed) if stats else None
 
     while not game.is_game_over():
-        question = game.get_new_question()
+        question = ui.profiler.call('logic.get_new_question', game.get_new_question)
         if not question: break
 
         while True:
@@ -415,12 +371,24 @@ def play_game(ui):
                 selected_option = -1
                 break
             selected_option = ui.show_question(
-                question, game.score, game.lives, game.round_number, current_time, game.time_multiplier, game.base_time
+                question, game.score, game.lives, game.round_number, current_time, game.time_multiplier, game.base_time,
+                grid=game.grid, revealed=game.revealed
             )
             if selected_option is not None: break
 
-        is_correct, message = game.check_answer(selected_option)
+        response_time = game.clock() - game.start_time
+        is_correct, message = ui.profiler.call('logic.check_answer', game.check_answer, selected_option)
+        if stats:
+            selected = question['options'][selected_option] if selected_option >= 0 else None
+            stats.record_answer(session_id, game.round_number, question['answer'], selected, is_correct, response_time)
         ui.show_feedback(message, is_correct, correct_word=question['answer'] if not is_correct else None)
 
     final_message = game.get_final_message()
-    ui.show_game_over(game.score, final_message)
\ No newline at end of file
+    leaderboard = None
+    if stats:
+        # Rows are stamped with wall-clock time: reading game.clock() here would only happen
+        # with stats on and shift the recorded clock stream that replays consume
+        stats.finish_session(session_id, game.score, game.round_number, game.lives, game.has_won())
+        stats.flush() # The leaderboard should include this game
+        leaderboard = stats.leaderboard(difficulty, limit=5)
+    ui.show_game_over(game.score, final_message, leaderboard, session_id)
@@ -0,0 +1,165 @@
+import json
+import random
+import time
+
+import pygame
+
+# Bump whenever the game consumes clock readings or RNG draws differently (or the file layout
+# changes): older recordings would still load but replay a shifted stream.
+# 2: response time clock read per answer, extra shuffle when building grids, launch settings
+REPLAY_VERSION = 2
+
+# Event attributes worth keeping; everything else (window ids, touch flags...) is dropped.
+_EVENT_FIELDS = ('key', 'mod', 'scancode', 'unicode', 'pos', 'rel', 'buttons', 'button', 'w', 'h', 'x', 'y')
+
+
+def serialize_event(event):
+    """Turns a pygame event into a JSON-friendly [type, attrs] pair."""
+    attrs = {}
+    for name in _EVENT_FIELDS:
+        if name in event.dict:
+            value = event.dict[name]
+            attrs[name] = list(value) if isinstance(value, tuple) else value
+    return [event.type, attrs]
+
+
+def deserialize_event(data):
+    event_type, attrs = data
+    attrs = {k: tuple(v) if isinstance(v, list) else v for k, v in attrs.items()}
+    return pygame.event.Event(event_type, attrs)
+
+
+class LiveInput:
+    """Reads input, clocks and seeds straight from pygame and the OS."""
+    realtime = True
+
+    def events(self):
+        return pygame.event.get()
+
+    def mouse_pos(self):
+        return pygame.mouse.get_pos()
+
+    def ticks(self):
+        return pygame.time.get_ticks()
+
+    def time(self):
+        return time.time()
+
+    def seed(self):
+        return random.SystemRandom().getrandbits(32)
+
+
+class InputRecorder:
+    """
+    Wraps another input source and records everything it hands out:
+    per-frame event batches, mouse positions, clock readings and game seeds.
+    `settings` holds launch options the replay must reproduce (window size,
+    fullscreen, adaptive mode and the history it was seeded with).
+    """
+    def __init__(self, source=None):
+        self.source = source or LiveInput()
+        self.realtime = self.source.realtime
+        self.settings = {}
+        self.frames = []
+        self.mouse = []
+        self.tick_readings = []
+        self.time_readings = []
+        self.seeds = []
+
+    def events(self):
+        events = self.source.events()
+        self.frames.append([serialize_event(e) for e in events])
+        return events
+
+    def mouse_pos(self):
+        pos = self.source.mouse_pos()
+        self.mouse.append(list(pos))
+        return pos
+
+    def ticks(self):
+        value = self.source.ticks()
+        self.tick_readings.append(value)
+        return value
+
+    def time(self):
+        value = self.source.time()
+        self.time_readings.append(value)
+        return value
+
+    def seed(self):
+        value = self.source.seed()
+        self.seeds.append(value)
+        return value
+
+    def to_dict(self):
+        return {
+            'version': REPLAY_VERSION,
+            'pygame': pygame.version.ver,
+            'settings': self.settings,
+            'seeds': self.seeds,
+            'frames': self.frames,
+            'mouse': self.mouse,
+            'ticks': self.tick_readings,
+            'time': self.time_readings,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+
+class ReplayInput:
+    """
+    Plays back a recorded session. Every stream is consumed in the order it
+    was recorded, so the UI and CrosswordGame see exactly the same inputs.
+    Once the event stream runs out a QUIT event is injected to end the run.
+    """
+    realtime = False
+
+    def __init__(self, data):
+        if data.get('version') != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version: {data.get('version')}")
+        self.settings = data['settings']
+        self.seeds = list(data['seeds'])
+        self.frames = [[deserialize_event(e) for e in frame] for frame in data['frames']]
+        self.mouse = [tuple(pos) for pos in data['mouse']]
+        self.tick_readings = data['ticks']
+        self.time_readings = data['time']
+        self._frame = self._mouse = self._tick = self._time = self._seed = 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    @property
+    def finished(self):
+        return self._frame >= len(self.frames)
+
+    def events(self):
+        if self.finished:
+            return [pygame.event.Event(pygame.QUIT)]
+        events = self.frames[self._frame]
+        self._frame += 1
+        return events
+
+    def _next(self, values, index, default):
+        if index < len(values):
+            return values[index], index + 1
+        return (values[-1] if values else default), index
+
+    def mouse_pos(self):
+        value, self._mouse = self._next(self.mouse, self._mouse, (0, 0))
+        return value
+
+    def ticks(self):
+        value, self._tick = self._next(self.tick_readings, self._tick, 0)
+        return value
+
+    def time(self):
+        value, self._time = self._next(self.time_readings, self._time, 0.0)
+        return value
+
+    def seed(self):
+        value, self._seed = self._next(self.seeds, self._seed, 0)
+        return value
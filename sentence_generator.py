@@ -0,0 +1,143 @@
+import argparse
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+
+from ngram_models import NGramModels
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per sample."""
+    def __init__(self, words, weights):
+        n = len(words)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        self.words = list(words)
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left over is 1.0 up to rounding error, keep prob = 1.0
+
+    def sample(self, rng):
+        u = rng.random() * len(self.words)
+        i = int(u)
+        return self.words[i if u - i < self.prob[i] else self.alias[i]]
+
+
+class SentenceGenerator:
+    """
+    Samples text from an NGramModels' trigram and bigram counts.
+
+    Every context's continuation distribution is turned into an alias table up
+    front, so drawing a token costs O(1) regardless of how many words can follow.
+    Contexts without trigram continuations back off to bigrams, then unigrams.
+    temperature reshapes counts as count ** (1 / temperature), computed in log
+    space relative to the context's largest count so low temperatures cannot
+    overflow; top_k keeps only the k most frequent continuations of each context.
+    """
+    def __init__(self, model, temperature=1.0, top_k=None, seed=None, exclude=('<s>', '<unk>')):
+        if not hasattr(model.trigrams, 'items'):
+            raise TypeError("SentenceGenerator needs a model with exact n-gram counts")
+        if not temperature > 0: # Also rejects NaN
+            raise ValueError("temperature must be positive")
+        if math.isinf(1.0 / temperature):
+            raise ValueError(f"temperature {temperature!r} is too small to represent, "
+                             f"use at least {sys.float_info.min!r}")
+        self.temperature = temperature
+        self.top_k = top_k
+        self.rng = random.Random(seed)
+        self.exclude = set(exclude)
+
+        trigram_followers = defaultdict(list)
+        for (a, b, c), count in model.trigrams.items():
+            if c not in self.exclude:
+                trigram_followers[(a, b)].append((c, count))
+        bigram_followers = defaultdict(list)
+        for (a, b), count in model.bigrams.items():
+            if b not in self.exclude:
+                bigram_followers[a].append((b, count))
+        unigram_counts = [(w, c) for w, c in model.unigrams.items() if w not in self.exclude]
+
+        self.trigram_tables = {ctx: self._table(f) for ctx, f in trigram_followers.items()}
+        self.bigram_tables = {ctx: self._table(f) for ctx, f in bigram_followers.items()}
+        self.unigram_table = self._table(unigram_counts) if unigram_counts else None
+
+    def _table(self, followers):
+        if self.top_k:
+            followers = sorted(followers, key=lambda item: -item[1])[:self.top_k]
+        # exp((log c - log c_max) / T) is (c / c_max) ** (1 / T): at most 1, so it underflows instead of overflowing
+        log_max = math.log(max(c for _, c in followers))
+        weights = [math.exp((math.log(c) - log_max) / self.temperature) for _, c in followers]
+        return AliasTable([w for w, _ in followers], weights)
+
+    def next_token(self, previous, current):
+        table = (self.trigram_tables.get((previous, current))
+                 or self.bigram_tables.get(current)
+                 or self.unigram_table)
+        return table.sample(self.rng)
+
+    def generate(self, prefix=(), max_tokens=20):
+        """Continues `prefix` until </s> or max_tokens new words; returns the new words."""
+        history = ['<s>', '<s>'] + list(prefix)
+        previous, current = history[-2], history[-1]
+        words = []
+        for _ in range(max_tokens):
+            token = self.next_token(previous, current)
+            if token == '</s>':
+                break
+            words.append(token)
+            previous, current = current, token
+        return words
+
+    def sentence(self, prefix=(), max_tokens=20):
+        return " ".join(list(prefix) + self.generate(prefix, max_tokens))
+
+
+def main(argv=None):
+    from evaluate import read_corpus
+
+    parser = argparse.ArgumentParser(description="Benchmark alias-table sentence generation")
+    parser.add_argument("train", help="training corpus, one sentence per line")
+    parser.add_argument("--tokens", type=int, default=1000000, help="number of tokens to sample")
+    parser.add_argument("--temperature", type=float, default=1.0)
+    parser.add_argument("--top-k", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--samples", type=int, default=5, help="example sentences to print")
+    args = parser.parse_args(argv)
+
+    model = NGramModels(read_corpus(args.train))
+    start = time.perf_counter()
+    generator = SentenceGenerator(model, args.temperature, args.top_k, args.seed)
+    build_time = time.perf_counter() - start
+    print(f"Built {len(generator.trigram_tables)} trigram and {len(generator.bigram_tables)} "
+          f"bigram alias tables in {build_time:.2f}s")
+
+    for _ in range(args.samples):
+        print("  " + generator.sentence())
+
+    produced = 0
+    previous, current = '<s>', '<s>'
+    start = time.perf_counter()
+    while produced < args.tokens:
+        token = generator.next_token(previous, current)
+        produced += 1
+        if token == '</s>':
+            previous, current = '<s>', '<s>'
+        else:
+            previous, current = current, token
+    elapsed = time.perf_counter() - start
+    print(f"Sampled {produced} tokens in {elapsed:.2f}s ({produced / elapsed:,.0f} tokens/s)")
+
+
+if __name__ == "__main__":
+    main()
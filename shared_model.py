@@ -0,0 +1,353 @@
+import argparse
+import math
+import multiprocessing
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+from ngram_models import NGramModels, smoothed_probability
+from tokenizer import Tokenizer
+
+MAGIC = b'NGRAMSHM'
+SHARED_VERSION = 2
+# magic, version, words, vocab size, total count, unk id + 1, word types folded into <unk>,
+# then log2 capacity of the word/bigram/trigram tables
+_HEADER = struct.Struct('<8s9Q')
+_EMPTY = 0xFFFFFFFFFFFFFFFF
+_ID_BITS = 21 # Three word ids pack into one 64-bit trigram key
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _slot(h, bits):
+    """Fibonacci hashing: spreads `h` and keeps the top `bits` bits."""
+    return ((h * _GOLDEN) & _MASK64) >> (64 - bits)
+
+
+def _capacity_bits(n):
+    """Smallest power of two keeping the table at most half full."""
+    return max(3, (2 * n - 1).bit_length())
+
+
+def _layout(n_words, word_bits, bigram_bits, trigram_bits):
+    """Byte offsets of every section; identical in the publisher and in readers."""
+    sizes = [
+        ('offsets', 8 * (n_words + 1)),
+        ('word_slots', 8 * (1 << word_bits)),
+        ('unigram_counts', 8 * n_words),
+        ('bigram_keys', 8 * (1 << bigram_bits)),
+        ('bigram_counts', 8 * (1 << bigram_bits)),
+        ('trigram_keys', 8 * (1 << trigram_bits)),
+        ('trigram_counts', 8 * (1 << trigram_bits)),
+    ]
+    layout, position = {}, _HEADER.size
+    for name, size in sizes:
+        layout[name] = (position, size)
+        position += size
+    layout['blob'] = (position, None)
+    return layout
+
+
+def _fill(keys, counts, bits, items):
+    """Linear-probing insert of (key, count) pairs into parallel arrays."""
+    mask = (1 << bits) - 1
+    for key, count in items:
+        slot = _slot(key, bits)
+        while keys[slot] != _EMPTY:
+            slot = (slot + 1) & mask
+        keys[slot] = key
+        counts[slot] = count
+
+
+class SharedCountTable:
+    """Read-only .get() view over one shared count table, standing in for the count dicts."""
+    def __init__(self, model, order):
+        self.model = model
+        self.order = order
+
+    def get(self, key, default=0):
+        count = self.model.count((key,) if self.order == 1 else key)
+        return count if count else default
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __contains__(self, key):
+        return self.get(key) > 0
+
+
+class SharedVocab:
+    def __init__(self, model):
+        self.model = model
+
+    def __contains__(self, word):
+        return self.model.word_id(word) >= 0
+
+    def __len__(self):
+        return self.model.vocab_size
+
+
+class SharedNGramModels:
+    """
+    An NGramModels' vocabulary and counts laid out in one shared memory
+    segment, so any number of worker processes can score against a single
+    physical copy instead of each unpickling its own dicts.
+
+    Words are stored as a UTF-8 blob plus an offsets array; an open-addressing
+    table (crc32 of the UTF-8 bytes, linear probing) maps words to ids, and
+    bigram/trigram counts live in open-addressing tables keyed by word ids
+    packed into one 64-bit integer. Hashes never depend on PYTHONHASHSEED, so
+    every process agrees on slot positions. Readers see the segment through
+    read-only memoryviews; pickling sends only the segment name.
+    """
+    def __init__(self, shm, owner=False, tokenizer=None):
+        self.shm = shm
+        self.owner = owner
+        self.tokenizer = tokenizer or Tokenizer()
+        buf = shm.buf.toreadonly()
+        magic, version, n_words, vocab_size, total_count, unk, unk_types, word_bits, bigram_bits, trigram_bits = \
+            _HEADER.unpack_from(buf)
+        if magic != MAGIC or version != SHARED_VERSION:
+            buf.release()
+            raise ValueError(f"{shm.name} is not a shared n-gram model (version {SHARED_VERSION})")
+        self.n_words = n_words
+        self.vocab_size = vocab_size
+        self.total_count = total_count
+        self.unk_types = unk_types
+        self.word_bits, self.bigram_bits, self.trigram_bits = word_bits, bigram_bits, trigram_bits
+
+        self._views = [buf]
+        for name, (offset, size) in _layout(n_words, word_bits, bigram_bits, trigram_bits).items():
+            view = buf[offset:offset + size] if size is not None else buf[offset:]
+            if name != 'blob':
+                view = view.cast('Q')
+            self._views.append(view)
+            setattr(self, name, view)
+
+        self.unk_token = self.word(unk - 1) if unk else None
+        self.unigrams = SharedCountTable(self, 1)
+        self.bigrams = SharedCountTable(self, 2)
+        self.trigrams = SharedCountTable(self, 3)
+        self.vocab = SharedVocab(self)
+
+    @classmethod
+    def publish(cls, model, name=None):
+        """Copies `model`'s exact counts into a new shared memory segment owned by the caller."""
+        if not hasattr(model.trigrams, 'items'):
+            raise TypeError("Only models with exact n-gram counts can be published")
+        words = sorted(set(model.vocab) | set(model.unigrams))
+        if len(words) >= 1 << _ID_BITS:
+            raise ValueError(f"Vocabulary too large to share ({len(words)} words, limit {1 << _ID_BITS})")
+        ids = {word: i for i, word in enumerate(words)}
+        encoded = [word.encode('utf-8') for word in words]
+
+        word_bits = _capacity_bits(len(words))
+        bigram_bits = _capacity_bits(len(model.bigrams))
+        trigram_bits = _capacity_bits(len(model.trigrams))
+        layout = _layout(len(words), word_bits, bigram_bits, trigram_bits)
+        blob_offset = layout['blob'][0]
+        blob_size = sum(len(data) for data in encoded)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(1, blob_offset + blob_size))
+
+        offsets = array('Q', [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        word_slots = array('Q', [_EMPTY]) * (1 << word_bits)
+        mask = (1 << word_bits) - 1
+        for i, data in enumerate(encoded):
+            slot = _slot(zlib.crc32(data), word_bits)
+            while word_slots[slot] != _EMPTY:
+                slot = (slot + 1) & mask
+            word_slots[slot] = i
+
+        unigrams = array('Q', (model.unigrams.get(word, 0) for word in words))
+        bigram_keys = array('Q', [_EMPTY]) * (1 << bigram_bits)
+        bigram_counts = array('Q', bytes(8)) * (1 << bigram_bits)
+        _fill(bigram_keys, bigram_counts, bigram_bits,
+              ((ids[a] << _ID_BITS | ids[b], count) for (a, b), count in model.bigrams.items()))
+        trigram_keys = array('Q', [_EMPTY]) * (1 << trigram_bits)
+        trigram_counts = array('Q', bytes(8)) * (1 << trigram_bits)
+        _fill(trigram_keys, trigram_counts, trigram_bits,
+              ((ids[a] << 2 * _ID_BITS | ids[b] << _ID_BITS | ids[c], count)
+               for (a, b, c), count in model.trigrams.items()))
+
+        buf = shm.buf
+        unk = ids[model.unk_token] + 1 if model.unk_token is not None else 0
+        _HEADER.pack_into(buf, 0, MAGIC, SHARED_VERSION, len(words), len(model.vocab), model.total_count,
+                          unk, model.unk_types, word_bits, bigram_bits, trigram_bits)
+        sections = {'offsets': offsets, 'word_slots': word_slots, 'unigram_counts': unigrams,
+                    'bigram_keys': bigram_keys, 'bigram_counts': bigram_counts,
+                    'trigram_keys': trigram_keys, 'trigram_counts': trigram_counts}
+        for section, data in sections.items():
+            offset, size = layout[section]
+            buf[offset:offset + size] = data.tobytes()
+        buf[blob_offset:blob_offset + blob_size] = b''.join(encoded)
+        return cls(shm, owner=True, tokenizer=model.tokenizer)
+
+    @classmethod
+    def attach(cls, name, tokenizer=None):
+        """Attaches from an unrelated process; the publisher stays responsible for unlinking."""
+        shm = shared_memory.SharedMemory(name=name)
+        # Otherwise this process's resource tracker would unlink the segment when it exits
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm, tokenizer=tokenizer)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    def word(self, word_id):
+        return bytes(self.blob[self.offsets[word_id]:self.offsets[word_id + 1]]).decode('utf-8')
+
+    def word_id(self, word):
+        """Id of `word`, or -1 if it is not in the vocabulary."""
+        data = word.encode('utf-8')
+        bits = self.word_bits
+        mask = (1 << bits) - 1
+        slot = _slot(zlib.crc32(data), bits)
+        offsets, blob, word_slots = self.offsets, self.blob, self.word_slots
+        while True:
+            word_id = word_slots[slot]
+            if word_id == _EMPTY:
+                return -1
+            if blob[offsets[word_id]:offsets[word_id + 1]] == data:
+                return word_id
+            slot = (slot + 1) & mask
+
+    def count(self, words):
+        """Count of a 1-, 2- or 3-word tuple; 0 if any word or the n-gram is unseen."""
+        key = 0
+        for word in words:
+            word_id = self.word_id(word)
+            if word_id < 0:
+                return 0
+            key = key << _ID_BITS | word_id
+        if len(words) == 1:
+            return self.unigram_counts[key]
+        if len(words) == 2:
+            keys, counts, bits = self.bigram_keys, self.bigram_counts, self.bigram_bits
+        else:
+            keys, counts, bits = self.trigram_keys, self.trigram_counts, self.trigram_bits
+        mask = (1 << bits) - 1
+        slot = _slot(key, bits)
+        while True:
+            stored = keys[slot]
+            if stored == key:
+                return counts[slot]
+            if stored == _EMPTY:
+                return 0
+            slot = (slot + 1) & mask
+
+    def map_unknown(self, token):
+        if self.unk_token is None or self.word_id(token) >= 0:
+            return token
+        return self.unk_token
+
+    def calculate_probability(self, context, word):
+        return smoothed_probability(self, context, word)
+
+    def log_probability(self, context, word):
+        prob = self.calculate_probability(context, word)
+        return math.log(prob) if prob > 0 else float('-inf')
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self.owner:
+            self.unlink()
+        return False
+
+    def __getstate__(self):
+        # Child processes share the publisher's resource tracker, so a plain attach is safe there
+        return {'name': self.shm.name, 'tokenizer': self.tokenizer}
+
+    def __setstate__(self, state):
+        self.__init__(shared_memory.SharedMemory(name=state['name']), tokenizer=state['tokenizer'])
+
+
+def process_memory():
+    """(uss, pss, rss) of the current process in bytes, read from /proc."""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return uss, fields.get('Pss', 0), fields.get('Rss', 0)
+
+
+def _score_and_measure(sentences):
+    from evaluate import _score_worker_batch
+    result = _score_worker_batch(sentences)
+    return os.getpid(), process_memory(), result
+
+
+def run_workers(model, heldout_path, workers, order=3, batch_size=1000, start_method='spawn'):
+    """Scores `heldout_path` across `workers` processes; returns (result, {pid: (uss, pss, rss)})."""
+    from evaluate import EvaluationResult, _init_worker, read_batches
+    result = EvaluationResult()
+    memory = {}
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(workers, initializer=_init_worker, initargs=(model, order)) as pool:
+        for pid, usage, partial in pool.imap_unordered(_score_and_measure, read_batches(heldout_path, batch_size)):
+            result.merge(partial)
+            memory[pid] = max(memory.get(pid, usage), usage)
+    return result, memory
+
+
+def main(argv=None):
+    from evaluate import read_corpus
+
+    parser = argparse.ArgumentParser(description="Compare per-worker memory of shared vs per-process models")
+    parser.add_argument("train", help="training corpus, one sentence per line")
+    parser.add_argument("heldout", help="held-out corpus, one sentence per line")
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--start-method", default='spawn', choices=multiprocessing.get_all_start_methods())
+    args = parser.parse_args(argv)
+
+    model = NGramModels(read_corpus(args.train))
+    start = time.perf_counter()
+    shared = SharedNGramModels.publish(model)
+    print(f"Published {shared.n_words} words, {len(model.bigrams)} bigrams, {len(model.trigrams)} trigrams "
+          f"into {shared.nbytes / 1e6:.2f} MB of shared memory in {time.perf_counter() - start:.2f}s "
+          f"(dicts: ~{model.memory_usage() / 1e6:.2f} MB per process)")
+
+    with shared:
+        for workers in args.workers:
+            for label, candidate in (('dicts', model), ('shared', shared)):
+                start = time.perf_counter()
+                result, memory = run_workers(candidate, args.heldout, workers, batch_size=args.batch_size,
+                                             start_method=args.start_method)
+                elapsed = time.perf_counter() - start
+                uss = sum(m[0] for m in memory.values()) / len(memory)
+                pss = sum(m[1] for m in memory.values()) / len(memory)
+                print(f"{workers:2} workers, {label:6}: USS {uss / 1e6:7.2f} MB/worker, "
+                      f"PSS {pss / 1e6:7.2f} MB/worker, total USS {uss * len(memory) / 1e6:8.2f} MB, "
+                      f"perplexity {result.perplexity:.2f}, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    if not sys.platform.startswith('linux'):
+        sys.exit("The memory benchmark reads /proc and only runs on Linux")
+    main()
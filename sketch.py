@@ -0,0 +1,248 @@
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from array import array
+from collections import defaultdict
+from hashlib import blake2b
+
+from ngram_models import NGramModels
+
+_KEY_SEPARATOR = '\x1f'
+
+
+def _key_bytes(key):
+    if isinstance(key, tuple):
+        key = _KEY_SEPARATOR.join(key)
+    return key.encode('utf-8')
+
+
+class CountMinSketch:
+    """
+    Fixed-memory approximate counter (Cormode & Muthukrishnan).
+
+    With width w = ceil(e / epsilon) and depth d = ceil(ln(1 / delta)), an
+    estimate never undercounts and, with probability at least 1 - delta,
+    overcounts by at most epsilon * N, where N is the total count added.
+    Conservative update only raises the cells that hold the current minimum,
+    which tightens estimates in practice without breaking that bound.
+    Hashes are derived from blake2b so sketches built in different processes
+    agree on cell positions and can be merged by adding their tables.
+    """
+    def __init__(self, width=1 << 18, depth=4, conservative=True):
+        self.width = width
+        self.depth = depth
+        self.conservative = conservative
+        self.total = 0
+        self.table = array('Q', bytes(8 * width * depth))
+
+    @classmethod
+    def from_error_bounds(cls, epsilon, delta, conservative=True):
+        """Sizes the sketch so errors stay below epsilon * N with probability 1 - delta."""
+        width = int(math.ceil(math.e / epsilon))
+        depth = int(math.ceil(math.log(1 / delta)))
+        return cls(width, depth, conservative)
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+    @property
+    def error_bound(self):
+        """Maximum overcount (with probability 1 - delta) for the counts added so far."""
+        return self.epsilon * self.total
+
+    def memory_bytes(self):
+        return self.table.itemsize * len(self.table)
+
+    def _cells(self, key):
+        digest = blake2b(_key_bytes(key), digest_size=8).digest()
+        h = int.from_bytes(digest, 'little')
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def add(self, key, count=1):
+        table = self.table
+        cells = self._cells(key)
+        self.total += count
+        if self.conservative:
+            target = min(table[c] for c in cells) + count
+            for c in cells:
+                if table[c] < target:
+                    table[c] = target
+        else:
+            for c in cells:
+                table[c] += count
+
+    def estimate(self, key):
+        table = self.table
+        return min(table[c] for c in self._cells(key))
+
+    def merge(self, other):
+        """Adds another sketch's counts into this one (both must share dimensions)."""
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Cannot merge sketches with different dimensions")
+        self.table = array('Q', map(sum, zip(self.table, other.table)))
+        self.total += other.total
+        return self
+
+
+class SketchTable:
+    """Read-only dict-like view so NGramModels code can call .get() on a sketch."""
+    def __init__(self, sketch):
+        self.sketch = sketch
+
+    def get(self, key, default=0):
+        return self.sketch.estimate(key) or default
+
+    def __getitem__(self, key):
+        return self.sketch.estimate(key)
+
+
+class SketchNGramModels(NGramModels):
+    """
+    NGramModels with bigram and trigram counts held in a shared Count-Min Sketch.
+    Unigrams and the vocabulary stay exact; they are small next to the higher
+    orders and the add-one denominator needs the true vocabulary size.
+    """
+    def __init__(self, corpus, width=1 << 18, depth=4, conservative=True, tokenizer=None):
+        self.sketch = CountMinSketch(width, depth, conservative)
+        super().__init__(corpus, tokenizer=tokenizer)
+        self.bigrams = self.trigrams = SketchTable(self.sketch)
+
+    def build_ngram_models(self):
+        """Build n-gram counts from corpus into the sketch"""
+        add = self.sketch.add
+        unigrams = self.unigrams
+        for tokens in self.tokenizer.iter_token_lists(self.corpus):
+            prev2, prev1 = None, '<s>'
+            unigrams['<s>'] += 1
+            for token in tokens:
+                unigrams[token] += 1
+                add((prev1, token))
+                if prev2 is not None:
+                    add((prev2, prev1, token))
+                prev2, prev1 = prev1, token
+            unigrams['</s>'] += 1
+            add((prev1, '</s>'))
+            if prev2 is not None:
+                add((prev2, prev1, '</s>'))
+            self.total_count += len(tokens) + 2
+        self.vocab.update(unigrams)
+
+    def merge(self, other):
+        """Folds counts from a model built on another shard of the corpus."""
+        self.sketch.merge(other.sketch)
+        for token, count in other.unigrams.items():
+            self.unigrams[token] += count
+        self.vocab.update(other.vocab)
+        self.total_count += other.total_count
+        return self
+
+    def _count_tables(self):
+        return (self.unigrams,)
+
+    def memory_usage(self):
+        return self.sketch.memory_bytes() + super().memory_usage()
+
+    def prune(self, *args, **kwargs):
+        raise TypeError("Sketch-backed models cannot be pruned; size the sketch instead")
+
+    @classmethod
+    def from_file(cls, path, workers=1, width=1 << 18, depth=4, conservative=True):
+        """Builds the model from a one-sentence-per-line file, sharded across processes."""
+        if workers <= 1:
+            with open(path, encoding='utf-8') as f:
+                return cls((line.strip() for line in f if line.strip()), width, depth, conservative)
+
+        size = os.path.getsize(path)
+        bounds = [size * i // workers for i in range(workers + 1)]
+        jobs = [(path, bounds[i], bounds[i+1], width, depth, conservative) for i in range(workers)]
+        with multiprocessing.Pool(workers) as pool:
+            shards = pool.map(_build_shard, jobs)
+        model = shards[0]
+        for shard in shards[1:]:
+            model.merge(shard)
+        return model
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['corpus'] = None # Generators and file iterators cannot be pickled
+        del state['bigrams'], state['trigrams']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.bigrams = self.trigrams = SketchTable(self.sketch)
+
+
+def _read_shard(path, start, end):
+    """Yields the lines whose first byte falls in [start, end)."""
+    with open(path, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            f.readline() # Skip to the first line starting at or after `start`
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            line = line.decode('utf-8').strip()
+            if line:
+                yield line
+
+
+def _build_shard(job):
+    path, start, end, width, depth, conservative = job
+    return SketchNGramModels(_read_shard(path, start, end), width, depth, conservative)
+
+
+def main(argv=None):
+    from evaluate import evaluate, read_corpus
+
+    parser = argparse.ArgumentParser(description="Benchmark the Count-Min Sketch backend against exact counts")
+    parser.add_argument("train", help="training corpus, one sentence per line")
+    parser.add_argument("heldout", help="held-out corpus, one sentence per line")
+    parser.add_argument("--width", type=int, default=1 << 18)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--no-conservative", action="store_true", help="use plain (non-conservative) updates")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    exact = NGramModels(read_corpus(args.train))
+    exact_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    approx = SketchNGramModels.from_file(args.train, args.workers, args.width, args.depth,
+                                         not args.no_conservative)
+    approx_build = time.perf_counter() - start
+
+    errors = defaultdict(list)
+    for table, name in ((exact.bigrams, 'bigram'), (exact.trigrams, 'trigram')):
+        for key, count in table.items():
+            errors[name].append(approx.sketch.estimate(key) - count)
+
+    exact_eval = evaluate(exact, args.heldout, workers=args.workers)
+    approx_eval = evaluate(approx, args.heldout, workers=args.workers)
+    sketch = approx.sketch
+
+    print(f"sketch: width {sketch.width}, depth {sketch.depth}, epsilon {sketch.epsilon:.2e}, "
+          f"delta {sketch.delta:.3f}, N {sketch.total}, bound +{sketch.error_bound:.1f}")
+    print(f"exact : built in {exact_build:.2f}s, ~{exact.memory_usage() / 1e6:.2f} MB, "
+          f"perplexity {exact_eval.perplexity:.2f}")
+    print(f"sketch: built in {approx_build:.2f}s ({args.workers} workers), "
+          f"~{approx.memory_usage() / 1e6:.2f} MB, perplexity {approx_eval.perplexity:.2f}")
+    for name, diffs in errors.items():
+        within = sum(1 for d in diffs if d <= sketch.error_bound) / len(diffs)
+        print(f"{name}: mean overcount {sum(diffs) / len(diffs):.3f}, max {max(diffs)}, "
+              f"exact {sum(1 for d in diffs if d == 0) / len(diffs):.1%}, within bound {within:.1%}")
+
+
+if __name__ == "__main__":
+    main()
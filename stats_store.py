@@ -0,0 +1,236 @@
+import argparse
+import itertools
+import logging
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = "stats.db"
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    seed INTEGER,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    score INTEGER,
+    rounds INTEGER,
+    lives INTEGER,
+    won INTEGER
+);
+CREATE TABLE IF NOT EXISTS answers (
+    session_id INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    selected TEXT,
+    correct INTEGER NOT NULL,
+    response_time REAL NOT NULL,
+    PRIMARY KEY (session_id, round)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS answer_totals (
+    answer TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sessions_leaderboard ON sessions (difficulty, score DESC, ended_at);
+CREATE INDEX IF NOT EXISTS idx_answers_answer ON answers (answer);
+"""
+
+_INSERT_SESSION = "INSERT INTO sessions (difficulty, seed, started_at) VALUES (?, ?, ?)"
+_FINISH_SESSION = "UPDATE sessions SET ended_at = ?, score = ?, rounds = ?, lives = ?, won = ? WHERE id = ?"
+_INSERT_ANSWER = ("INSERT INTO answers (session_id, round, answer, selected, correct, response_time) "
+                  "VALUES (?, ?, ?, ?, ?, ?)")
+_COUNT_ANSWER = ("INSERT INTO answer_totals (answer, attempts, correct) VALUES (?, 1, ?) "
+                 "ON CONFLICT (answer) DO UPDATE SET attempts = attempts + 1, correct = correct + excluded.correct")
+_BACKFILL_TOTALS = "INSERT INTO answer_totals SELECT answer, COUNT(*), SUM(correct) FROM answers GROUP BY answer"
+
+_STOP = object()
+_FLUSH = object()
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL") # Readers never block the writer thread
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class StatsStore:
+    """
+    SQLite store for game sessions and per-question answers.
+
+    Writes are write-behind: the game thread only puts (sql, params) pairs on
+    a queue, and a background thread drains it, grouping consecutive rows for
+    the same statement into one executemany and committing once per batch.
+    The one exception is the session row, inserted synchronously so SQLite
+    assigns its id: several game processes can share one stats file without
+    handing out the same id. Reads use their own connection.
+
+    The writer also keeps answer_totals (attempts and solves per answer word)
+    up to date as answers go in, so seeding the difficulty engine reads one
+    row per word instead of aggregating the whole answers table.
+    """
+    def __init__(self, path=DEFAULT_PATH, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.conn = connect(path)
+        if self.conn.execute("SELECT 1 FROM answer_totals LIMIT 1").fetchone() is None:
+            with self.conn: # Databases written before answer_totals existed
+                self.conn.execute(_BACKFILL_TOTALS)
+        self.last_error = None
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="stats-writer", daemon=True)
+        self._writer.start()
+
+    # --- Writes (queued, except start_session) ---
+
+    def start_session(self, difficulty, seed=None, started_at=None):
+        """Inserts the session row (one small blocking commit, once per game) and returns its id."""
+        started_at = time.time() if started_at is None else started_at
+        with self.conn:
+            return self.conn.execute(_INSERT_SESSION, (difficulty, seed, started_at)).lastrowid
+
+    def record_answer(self, session_id, round_number, answer, selected, correct, response_time):
+        self._queue.put((_INSERT_ANSWER, (session_id, round_number, answer, selected, int(correct), response_time)))
+
+    def finish_session(self, session_id, score, rounds, lives, won, ended_at=None):
+        ended_at = time.time() if ended_at is None else ended_at
+        self._queue.put((_FINISH_SESSION, (ended_at, score, rounds, lives, int(won), session_id)))
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Give a burst of writes a moment to pile up, then take as many as fit
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _STOP and item is not _FLUSH and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stop = batch[-1] is _STOP
+            rows = [row for row in batch if row is not _STOP and row is not _FLUSH]
+            try:
+                with conn:
+                    for sql, group in itertools.groupby(rows, key=lambda row: row[0]):
+                        self._execute(conn, sql, [params for _, params in group])
+            except sqlite3.Error as e:
+                log.warning("Batch of %d stats rows failed (%s); retrying one at a time", len(rows), e)
+                self._write_rows(conn, rows)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                conn.close()
+                return
+
+    def _execute(self, conn, sql, params):
+        conn.executemany(sql, params)
+        if sql is _INSERT_ANSWER:
+            conn.executemany(_COUNT_ANSWER, [(row[2], row[4]) for row in params])
+
+    def _write_rows(self, conn, rows):
+        """Writes rows individually so one bad row only loses itself."""
+        for sql, params in rows:
+            try:
+                with conn:
+                    self._execute(conn, sql, [params])
+            except sqlite3.Error as e:
+                self.last_error = e
+                log.error("Dropped stats row %r: %s", params, e)
+
+    def flush(self):
+        """Blocks until every queued write has been committed."""
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self.conn.close()
+
+    # --- Reads ---
+
+    def leaderboard(self, difficulty, limit=10):
+        """Top finished games for `difficulty`: (id, score, rounds, won, ended_at) rows, best first."""
+        return self.conn.execute(
+            "SELECT id, score, rounds, won, ended_at FROM sessions "
+            "WHERE difficulty = ? AND score IS NOT NULL ORDER BY score DESC, ended_at LIMIT ?",
+            (difficulty, limit)).fetchall()
+
+    def rank(self, difficulty, score):
+        """1-based position `score` would take on the `difficulty` leaderboard."""
+        better = self.conn.execute("SELECT COUNT(*) FROM sessions WHERE difficulty = ? AND score > ?",
+                                   (difficulty, score)).fetchone()[0]
+        return better + 1
+
+    def answer_stats(self, answer):
+        """(attempts, correct, mean response time) for one answer word."""
+        return self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(correct), 0), AVG(response_time) FROM answers WHERE answer = ?",
+            (answer,)).fetchone()
+
+    def answer_totals(self):
+        """(answer, attempts, correct) for every answer word ever asked."""
+        return self.conn.execute("SELECT answer, attempts, correct FROM answer_totals").fetchall()
+
+    def explain_leaderboard(self, difficulty):
+        return [row[-1] for row in self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT score, rounds, won, ended_at FROM sessions "
+            "WHERE difficulty = ? AND score IS NOT NULL ORDER BY score DESC, ended_at LIMIT 10", (difficulty,))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the leaderboard or benchmark the stats store")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH, help="SQLite stats database")
+    parser.add_argument("--difficulty", default="easy", choices=["easy", "medium", "hard"])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--populate", type=int, metavar="GAMES",
+                        help="first insert GAMES synthetic games (10 answers each) and time it")
+    args = parser.parse_args(argv)
+
+    store = StatsStore(args.path)
+    if args.populate:
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(args.populate):
+            difficulty = rng.choice(["easy", "medium", "hard"])
+            session_id = store.start_session(difficulty, rng.getrandbits(32))
+            score = 0
+            for round_number in range(1, 11):
+                correct = rng.random() < 0.6
+                score += correct
+                store.record_answer(session_id, round_number, "word", "word" if correct else "other",
+                                    correct, rng.uniform(1, 30))
+            store.finish_session(session_id, score, 10, 3, score == 10)
+        queued = time.perf_counter() - start
+        store.flush()
+        total = time.perf_counter() - start
+        print(f"Queued {args.populate} games in {queued:.2f}s ({queued / args.populate * 1e6:.1f} us/game), "
+              f"committed after {total:.2f}s")
+        if store.last_error:
+            print(f"Writer error: {store.last_error}")
+
+    start = time.perf_counter()
+    rows = store.leaderboard(args.difficulty, args.limit)
+    elapsed = time.perf_counter() - start
+    print(f"Top {args.limit} ({args.difficulty}) in {elapsed * 1000:.2f} ms "
+          f"using: {'; '.join(store.explain_leaderboard(args.difficulty))}")
+    for i, (_, score, rounds, won, ended_at) in enumerate(rows, 1):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(ended_at))
+        print(f"  {i:2}. {score}/{rounds}{' WON' if won else ''}  {when}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import re
+import string
+import unicodedata
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_PUNCTUATION = re.compile(r"[^\w\s']+|(?<!\w)'|'(?!\w)")
+_PUNCTUATION_ALL = re.compile(r"[^\w\s]+")
+_STRAY_APOSTROPHE = re.compile(r"(?<!\w)'|'(?!\w)")
+# str.translate has a fast path for ASCII-only tables, far cheaper than a regex pass
+_ASCII_PUNCTUATION = str.maketrans({ch: ' ' for ch in string.punctuation if ch not in "'_"})
+_ASCII_PUNCTUATION_ALL = str.maketrans({ch: ' ' for ch in string.punctuation if ch != '_'})
+# Typographic apostrophes NFKC leaves alone (plus the fullwidth one), so "don’t" matches "don't"
+_APOSTROPHES = str.maketrans({ch: "'" for ch in '\u2018\u2019\u02bc\uff07'})
+
+
+class Tokenizer:
+    """
+    Normalises and splits text into tokens for model building, question
+    generation and answer checking. Batches are joined into one string so
+    Unicode normalisation, lowercasing and punctuation stripping each run
+    once per batch in C instead of once per sentence or per token.
+    """
+    def __init__(self, lowercase=True, strip_punctuation=True, normalization='NFKC',
+                 keep_apostrophes=True, sentence_split=False):
+        self.lowercase = lowercase
+        self.strip_punctuation = strip_punctuation
+        self.normalization = normalization
+        self.keep_apostrophes = keep_apostrophes
+        self.sentence_split = sentence_split
+
+    def normalize(self, text):
+        """Applies Unicode normalisation, case folding and punctuation stripping."""
+        ascii_only = text.isascii()
+        if not ascii_only:
+            text = text.translate(_APOSTROPHES)
+            if self.normalization:
+                text = unicodedata.normalize(self.normalization, text)
+            ascii_only = text.isascii()
+        if self.lowercase:
+            text = text.lower()
+        if not self.strip_punctuation:
+            return text
+        if not ascii_only:
+            pattern = _PUNCTUATION if self.keep_apostrophes else _PUNCTUATION_ALL
+            return pattern.sub(' ', text)
+        if not self.keep_apostrophes:
+            return text.translate(_ASCII_PUNCTUATION_ALL)
+        text = text.translate(_ASCII_PUNCTUATION)
+        if "'" in text:
+            text = _STRAY_APOSTROPHE.sub(' ', text)
+        return text
+
+    def normalize_word(self, word):
+        return " ".join(self.normalize(word).split())
+
+    def tokenize(self, text):
+        return self.normalize(text).split()
+
+    def split_sentences(self, paragraph):
+        """Splits raw paragraph text on sentence-final punctuation."""
+        return [s for s in _SENTENCE_END.split(paragraph.strip()) if s]
+
+    def tokenize_batch(self, texts):
+        """Tokenises a list of sentences, returning one token list per sentence."""
+        if self.sentence_split:
+            texts = [s for text in texts for s in self.split_sentences(text)]
+        if not texts:
+            return []
+        joined = "\n".join(texts)
+        if joined.count("\n") != len(texts) - 1:
+            # Embedded newlines would shift sentence boundaries, fall back to one at a time
+            return [self.tokenize(text) for text in texts]
+        return [line.split() for line in self.normalize(joined).split("\n")]
+
+    def iter_token_lists(self, corpus, batch_size=10000):
+        """Streams token lists from any iterable of sentences, `batch_size` at a time."""
+        batch = []
+        for text in corpus:
+            batch.append(text)
+            if len(batch) >= batch_size:
+                yield from self.tokenize_batch(batch)
+                batch = []
+        if batch:
+            yield from self.tokenize_batch(batch)
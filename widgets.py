@@ -0,0 +1,385 @@
+import contextlib
+
+import pygame
+
+
+class Widget:
+    """Base class for retained-mode widgets: a rect, a visibility flag and a draw method."""
+    def __init__(self, rect=(0, 0, 0, 0)):
+        self.rect = pygame.Rect(rect)
+        self.visible = True
+        self.owner = None # Screen whose cached layer must be rebuilt when this widget changes
+
+    def changed(self):
+        if self.owner is not None:
+            self.owner.invalidate()
+
+    def draw(self, surface):
+        pass
+
+
+class Label(Widget):
+    """Text rendered once and re-rendered only when its text or colour changes."""
+    def __init__(self, text, font, color, **anchor):
+        super().__init__()
+        self.font = font
+        self.color = color
+        self.anchor = anchor or {'topleft': (0, 0)}
+        self.text = None
+        self.surface = None
+        self.set_text(text)
+
+    def set_text(self, text, color=None):
+        color = color or self.color
+        if text == self.text and color == self.color and self.surface is not None:
+            return
+        self.text, self.color = text, color
+        self.surface = self.font.render(text, True, color)
+        self.rect = self.surface.get_rect(**self.anchor)
+        self.changed()
+
+    def draw(self, surface):
+        surface.blit(self.surface, self.rect)
+
+
+class Panel(Widget):
+    """Filled rectangle with an optional border."""
+    def __init__(self, rect, fill=None, border=None, border_width=3):
+        super().__init__(rect)
+        self.fill = fill
+        self.border = border
+        self.border_width = border_width
+
+    def draw(self, surface):
+        if self.fill is not None:
+            pygame.draw.rect(surface, self.fill, self.rect)
+        if self.border is not None:
+            pygame.draw.rect(surface, self.border, self.rect, self.border_width)
+
+
+class ProgressBar(Widget):
+    """Horizontal bar filled to `fraction` of its width."""
+    def __init__(self, rect, colors, fraction=1.0, fill=None):
+        super().__init__(rect)
+        self.colors = colors
+        self.fraction = fraction
+        self.fill = fill or colors.GREEN
+
+    def set_value(self, fraction, fill=None):
+        fraction, fill = max(0, min(1, fraction)), fill or self.fill
+        if (fraction, fill) != (self.fraction, self.fill):
+            self.fraction, self.fill = fraction, fill
+            self.changed()
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.colors.WHITE, self.rect)
+        pygame.draw.rect(surface, self.colors.BLACK, self.rect, 2)
+        filled_width = int(self.rect.width * self.fraction)
+        if filled_width > 0:
+            pygame.draw.rect(surface, self.fill, (self.rect.x, self.rect.y, filled_width, self.rect.height))
+
+
+class Image(Widget):
+    def __init__(self, image, topleft=(0, 0)):
+        super().__init__(image.get_rect(topleft=topleft))
+        self.image = image
+
+    def draw(self, surface):
+        surface.blit(self.image, self.rect)
+
+
+class Button(Widget):
+    """Represents a clickable button with hover and selected states."""
+    def __init__(self, x, y, width, height, text, font, colors):
+        super().__init__((x, y, width, height))
+        self.text = text
+        self.font = font
+        self.colors = colors
+        self.is_hovered = False
+        self.is_selected = False
+        self._surfaces = {} # One prerendered surface per visual state
+
+    def _render(self, state):
+        colors = self.colors
+        surface = pygame.Surface(self.rect.size)
+        local = surface.get_rect()
+        if state == 'selected':
+            surface.fill(colors.DARK_GRAY)
+            pygame.draw.rect(surface, colors.WHITE, local, 3)
+        else:
+            surface.fill(colors.LIGHT_GRAY if state == 'hovered' else colors.WHITE)
+            pygame.draw.rect(surface, colors.BLACK, local, 2)
+        text_color = colors.WHITE if state == 'selected' else colors.BLACK
+        text_surface = self.font.render(self.text, True, text_color)
+        surface.blit(text_surface, text_surface.get_rect(center=local.center))
+        return surface
+
+    def draw(self, screen):
+        state = 'selected' if self.is_selected else 'hovered' if self.is_hovered else 'normal'
+        if state not in self._surfaces:
+            self._surfaces[state] = self._render(state)
+        screen.blit(self._surfaces[state], self.rect)
+
+    def is_clicked(self, pos):
+        """Checks if a given mouse position is inside the button."""
+        return self.rect.collidepoint(pos)
+
+    def set_hover(self, is_hovered):
+        self.is_hovered = is_hovered
+
+    def set_selected(self, is_selected):
+        self.is_selected = is_selected
+
+
+class WordRow(Widget):
+    """The single-answer crossword row: numbered cells, optionally filled in."""
+    def __init__(self, word_length, center_x, top, colors, number_font, letter_font, letters="", cell_size=50):
+        grid_width = word_length * cell_size
+        start_x = center_x - grid_width // 2
+        pad = cell_size // 5
+        super().__init__((start_x - pad, top - pad, grid_width + 2 * pad, cell_size + 2 * pad))
+        surface = pygame.Surface(self.rect.size)
+        surface.fill(colors.LIGHT_GRAY)
+        pygame.draw.rect(surface, colors.BLACK, surface.get_rect(), 3)
+        for i in range(word_length):
+            x, y = pad + i * cell_size, pad
+            pygame.draw.rect(surface, colors.WHITE, (x, y, cell_size, cell_size))
+            pygame.draw.rect(surface, colors.BLACK, (x, y, cell_size, cell_size), 2)
+            surface.blit(number_font.render(str(i + 1), True, colors.DARK_GRAY), (x + 2, y + 2))
+            if i < len(letters):
+                letter_surface = letter_font.render(letters[i].upper(), True, colors.BLACK)
+                center = (x + cell_size // 2, y + cell_size // 2 + cell_size // 10)
+                surface.blit(letter_surface, letter_surface.get_rect(center=center))
+        self.surface = surface
+
+    def draw(self, surface):
+        surface.blit(self.surface, self.rect)
+
+
+class CrosswordView(Widget):
+    """
+    A full crossword grid scaled into `area`, cached until revealed/active
+    words change. `scale` multiplies the cell size limits along with the
+    rest of the layout.
+    """
+    _fonts = {}
+
+    def __init__(self, grid, area, colors, number_font, scale=1.0):
+        super().__init__(area)
+        self.grid = grid
+        self.colors = colors
+        self.number_font = number_font
+        self.scale = scale
+        self.cell_size = max(round(12 * scale), min(round(44 * scale), self.rect.width // grid.cols,
+                                                     self.rect.height // grid.rows))
+        self.origin = (self.rect.x + (self.rect.width - grid.cols * self.cell_size) // 2,
+                       self.rect.y + (self.rect.height - grid.rows * self.cell_size) // 2)
+        self.revealed = None
+        self.active_word = None
+        self.surface = None
+
+    def set_state(self, revealed, active_word=None):
+        revealed = frozenset(revealed)
+        if revealed != self.revealed or active_word != self.active_word:
+            self.revealed, self.active_word = revealed, active_word
+            self.surface = None
+            self.changed()
+
+    def _letter_font(self):
+        size = int(self.cell_size * 0.9)
+        if size not in self._fonts:
+            self._fonts[size] = pygame.font.Font(None, size)
+        return self._fonts[size]
+
+    def _render(self):
+        grid, colors, cell = self.grid, self.colors, self.cell_size
+        surface = pygame.Surface((grid.cols * cell, grid.rows * cell), pygame.SRCALPHA)
+        letter_font = self._letter_font()
+        active_cells = set(grid.cells_for(self.active_word)) if self.active_word else set()
+        revealed_cells = set()
+        for word in self.revealed or ():
+            revealed_cells.update(grid.cells_for(word))
+
+        for (row, col), letter in grid.cells.items():
+            x, y = col * cell, row * cell
+            fill = colors.LIGHT_GRAY if (row, col) in active_cells else colors.WHITE
+            pygame.draw.rect(surface, fill, (x, y, cell, cell))
+            pygame.draw.rect(surface, colors.BLACK, (x, y, cell, cell), 2)
+            number = grid.numbers.get((row, col))
+            if number and cell >= 24 * self.scale:
+                surface.blit(self.number_font.render(str(number), True, colors.DARK_GRAY), (x + 2, y + 2))
+            if (row, col) in revealed_cells:
+                letter_surface = letter_font.render(letter.upper(), True, colors.BLACK)
+                surface.blit(letter_surface, letter_surface.get_rect(center=(x + cell // 2, y + cell // 2 + 2)))
+        return surface
+
+    def draw(self, surface):
+        if self.surface is None:
+            self.surface = self._render()
+        surface.blit(self.surface, self.origin)
+
+
+def _untimed(name):
+    return contextlib.nullcontext()
+
+
+class SpatialIndex:
+    """Uniform grid of buckets so hit-testing only checks widgets near the cursor."""
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self.buckets = {}
+
+    def rebuild(self, widgets):
+        self.buckets = {}
+        size = self.cell_size
+        for widget in widgets:
+            r = widget.rect
+            for cx in range(r.left // size, (r.right - 1) // size + 1):
+                for cy in range(r.top // size, (r.bottom - 1) // size + 1):
+                    self.buckets.setdefault((cx, cy), []).append(widget)
+
+    def at(self, pos):
+        for widget in self.buckets.get((pos[0] // self.cell_size, pos[1] // self.cell_size), ()):
+            if widget.visible and widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+
+class Screen:
+    """
+    Retained widget tree for one screen. Static widgets are drawn once onto a
+    cached layer that is only rebuilt when one of them changes; dynamic
+    widgets and buttons are blitted on top every frame.
+
+    layout(screen) adds the widgets for the current size; after reset() to
+    a new size it is called again to lay the screen out from scratch. Screens
+    whose content never changes can set keep_sizes to hold on to the widgets
+    and layer built for that many other sizes, so resize() switching back
+    (e.g. leaving fullscreen) does not lay out or render anything again.
+    """
+    def __init__(self, name, size, colors, background=None, border=True, selectable=True, layout=None):
+        self.name = name
+        self.size = size
+        self.layout = layout
+        self.colors = colors
+        self.background = colors.WHITE if background is None else background
+        self.border = border
+        self.selectable = selectable # Whether arrow keys move a selection across buttons
+        self.static = []
+        self.dynamic = []
+        self.buttons = []
+        self.selected = 0
+        self._layer = None
+        self._index = SpatialIndex()
+        self._index_dirty = True
+        self._mouse = None
+        self.keep_sizes = 0
+        self._saved = {} # size -> (static, dynamic, buttons, layer), oldest first
+        self.sections = {phase: f"{name}.{phase}" for phase in ('events', 'update', 'render', 'flip')}
+        # Render sub-phases: layer rebuilds (split per widget class), the layer blit, dynamic widgets, buttons
+        self.sections.update({part: f"{name}.render.{part}" for part in ('layer', 'blit', 'dynamic', 'buttons')})
+
+    def add(self, widget, static=True):
+        if isinstance(widget, Button):
+            self.buttons.append(widget)
+            self._index_dirty = True
+            return widget
+        if static:
+            widget.owner = self
+            self.static.append(widget)
+            self.invalidate()
+        else:
+            self.dynamic.append(widget)
+        return widget
+
+    def invalidate(self):
+        self._layer = None
+
+    def reset(self, size):
+        """Drops every widget and the cached layer; the selection is kept."""
+        self.size = size
+        self.static, self.dynamic, self.buttons = [], [], []
+        self._layer = None
+        self._index_dirty = True
+        self._mouse = None
+
+    def resize(self, size):
+        """
+        Switches to `size`, saving the current layout if keep_sizes allows.
+        Returns True if a layout saved for `size` was restored, False if the
+        screen was reset and has to be laid out again.
+        """
+        saved = self._saved.pop(size, None)
+        if self.keep_sizes:
+            self._saved[self.size] = (self.static, self.dynamic, self.buttons, self._layer)
+            while len(self._saved) > self.keep_sizes:
+                del self._saved[next(iter(self._saved))]
+        self.reset(size)
+        if saved is None:
+            return False
+        self.static, self.dynamic, self.buttons, self._layer = saved
+        return True
+
+    def _build_layer(self, section=_untimed):
+        layer = pygame.Surface(self.size)
+        if isinstance(self.background, pygame.Surface):
+            layer.blit(self.background, (0, 0))
+        else:
+            layer.fill(self.background)
+        if self.border:
+            pygame.draw.rect(layer, self.colors.BLACK, (0, 0, self.size[0], self.size[1]), 5)
+        for widget in self.static:
+            if widget.visible:
+                with section(f"{self.sections['layer']}.{type(widget).__name__}"):
+                    widget.draw(layer)
+        return layer
+
+    def button_at(self, pos):
+        if self._index_dirty:
+            self._index.rebuild(self.buttons)
+            self._index_dirty = False
+        return self._index.at(pos)
+
+    def update_hover(self, pos):
+        if pos == self._mouse:
+            return
+        self._mouse = pos
+        hovered = self.button_at(pos)
+        for button in self.buttons:
+            button.set_hover(button is hovered)
+
+    def handle_menu_event(self, event, pos):
+        """Arrow keys, ENTER, number keys and clicks; returns the chosen button index."""
+        count = len(self.buttons)
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                self.selected = (self.selected - 1) % count
+            elif event.key == pygame.K_DOWN:
+                self.selected = (self.selected + 1) % count
+            elif event.key == pygame.K_RETURN:
+                return self.selected
+            elif pygame.K_1 <= event.key < pygame.K_1 + count:
+                return event.key - pygame.K_1
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            button = self.button_at(pos)
+            if button is not None:
+                return self.buttons.index(button)
+        return None
+
+    def draw(self, surface, profiler=None):
+        """Draws the screen, timing its render sub-phases under `profiler` if given."""
+        section = profiler.section if profiler is not None else _untimed
+        sections = self.sections
+        if self._layer is None:
+            with section(sections['layer']):
+                self._layer = self._build_layer(section)
+        with section(sections['blit']):
+            surface.blit(self._layer, (0, 0))
+        with section(sections['dynamic']):
+            for widget in self.dynamic:
+                if widget.visible:
+                    widget.draw(surface)
+        with section(sections['buttons']):
+            for i, button in enumerate(self.buttons):
+                button.set_selected(self.selectable and i == self.selected)
+                button.draw(surface)